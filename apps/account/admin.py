@@ -1,9 +1,13 @@
 # Imports
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Lower
+
+from apps.auth.services.generations import revoke_all_tokens
+from apps.core.utils.pagination import EstimatedCountPaginator
 
 from .models import CustomUser, CustomUserProfile
 
@@ -72,10 +76,63 @@ class UserAdmin(BaseUserAdmin):
             "fields": ["email", "password1", "password2"],
         }),
     ]
+    # Matched by get_search_results()
     search_fields = ["email"]
-    ordering = ["email"]
-    filter_horizontal = ["groups", "user_permissions"]
+    search_help_text = "Email address, or how it starts (case-insensitive)"
+    # Ordering and search both use the lower(email) unique index
+    ordering = [Lower("email")]
+    # Any other column would sort the whole table
+    sortable_by = []
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Instead of filter_horizontal, which renders every group and permission
+    filter_horizontal = []
+    autocomplete_fields = ["groups"]
+    raw_id_fields = ["user_permissions"]
+    actions = ["log_out_everywhere"]
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match emails starting with the term: LIKE 'term%' on lower(email),
+        which PostgreSQL serves from the pattern_ops index (migration
+        0006) under any collation, rather than a LIKE '%term%' scan.
+        """
+        term = search_term.strip().lower()
+        if not term:
+            return queryset, False
+        return queryset.filter(email__lower__startswith=term), False
+
+    @admin.action(description="Log out of all sessions (revoke all tokens)")
+    def log_out_everywhere(self, request, queryset):
+        count = revoke_all_tokens(queryset)
+        self.message_user(
+            request,
+            f"Revoked all tokens of {count} user(s).",
+            messages.SUCCESS,
+        )
+
+
+# Profile Admin Django Dashboard Page
+class ProfileAdmin(admin.ModelAdmin):
+    # __str__ shows the user's email, joined by list_select_related
+    list_display = ["__str__", "phone", "is_phone_verified", "updated_at"]
+    list_select_related = ["user"]
+    list_filter = ["is_phone_verified"]
+    # Matched by get_search_results()
+    search_fields = ["phone"]
+    search_help_text = "Exact phone number"
+    sortable_by = []
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ["user"]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Exact match, served by the phone index
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(phone=term), False
 
 
 admin.site.register(CustomUser, UserAdmin)
-admin.site.register(CustomUserProfile)
+admin.site.register(CustomUserProfile, ProfileAdmin)
@@ -0,0 +1,55 @@
+# apps/account/management/commands/exportusers.py
+
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.account.services.export import InvalidCursor, UserExport
+from apps.core.utils.database import replica_reads
+
+
+class Command(BaseCommand):
+    help = (
+        "Export users and profiles as NDJSON in (updated_at, id) order. "
+        "Pass the printed cursor back as --since for an incremental sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', help='Cursor of the last record already exported'
+        )
+        parser.add_argument(
+            '--output', help='File to write to (default: stdout)'
+        )
+        parser.add_argument(
+            '--page-size', type=int,
+            help="Rows per query (default: USER_EXPORT['PAGE_SIZE'])"
+        )
+        parser.add_argument('--limit', type=int, help='Max records')
+        parser.add_argument(
+            '--primary', action='store_true',
+            help='Read from the primary even if replicas are configured'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with replica_reads() if not options['primary'] else nullcontext():
+                export = UserExport(
+                    since=options['since'],
+                    page_size=options['page_size'],
+                    limit=options['limit'],
+                )
+        except InvalidCursor as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.writelines(export.ndjson())
+        else:
+            for chunk in export.ndjson():
+                self.stdout.write(chunk, ending='')
+
+        self.stderr.write(
+            f'Exported {export.count} users; '
+            f'next cursor: {export.cursor or "-"}'
+        )
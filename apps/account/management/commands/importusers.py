@@ -0,0 +1,222 @@
+# apps/account/management/commands/importusers.py
+
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from apps.account.models import CustomUser, CustomUserProfile
+from apps.auth.services.hashing import init_hashing_worker
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+
+
+def read_records(path, fmt):
+    """
+    Yield one dict per CSV row / JSONL line, without loading the file.
+    """
+    with open(path, newline='', encoding='utf-8') as fh:
+        if fmt == 'csv':
+            yield from csv.DictReader(fh)
+        else:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_bool(value, default=True):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users (and their profiles) from a CSV or JSONL file with "
+        "columns email, password, phone, is_active. Passwords are hashed in "
+        "a process pool and rows are bulk-inserted in chunked transactions, "
+        "without per-row signals. Progress is checkpointed after each chunk, "
+        "so an interrupted import resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'],
+            help='Input format (default: from the file extension)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Rows inserted per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Password-hashing processes; 0 hashes inline '
+                 '(default: CPU count)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file (default: <path>.checkpoint)'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore an existing checkpoint and start from the top'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        fmt = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl'
+        )
+        chunk_size = options['chunk_size']
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+
+        done = 0 if options['restart'] else self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f'Resuming after {done} records')
+
+        records = itertools.islice(read_records(path, fmt), done, None)
+        chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+
+        workers = options['workers']
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=init_hashing_worker
+        ) if workers else None
+
+        self.imported = self.skipped = self.invalid = 0
+        started = time.monotonic()
+        pending = None
+        try:
+            # Hash chunk N+1 in the pool while chunk N is being inserted
+            for chunk in chunks:
+                rows = self.prepare(chunk)
+                passwords = [row['password'] for row in rows]
+                hashes = (
+                    executor.map(
+                        make_password, passwords,
+                        chunksize=max(1, len(passwords) // (workers * 4))
+                    ) if executor else map(make_password, passwords)
+                )
+                if pending:
+                    done = self.flush(pending, checkpoint, started)
+                pending = (done + len(chunk), rows, hashes)
+            if pending:
+                done = self.flush(pending, checkpoint, started)
+        except KeyboardInterrupt:
+            self.stderr.write(
+                f'Interrupted after {done} records; rerun to resume'
+            )
+            return
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} users in {elapsed:.1f}s '
+            f'(skipped {self.skipped} existing, {self.invalid} invalid)'
+        ))
+
+    def prepare(self, chunk):
+        """
+        Validate and normalise a chunk, dropping duplicates and emails that
+        already exist before any password is hashed.
+        """
+        rows = {}
+        for record in chunk:
+            email = CustomUser.objects.normalize_email(
+                (record.get('email') or '').strip()
+            )
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.invalid += 1
+                continue
+            if email.lower() in rows:
+                self.skipped += 1
+                continue
+            rows[email.lower()] = {
+                'email': email,
+                'password': record.get('password') or None,
+                'phone': (record.get('phone') or '')[:20],
+                'is_active': parse_bool(record.get('is_active')),
+            }
+
+        existing = self.existing_emails(rows)
+        self.skipped += len(existing)
+        return [row for key, row in rows.items() if key not in existing]
+
+    def existing_emails(self, keys):
+        # Lower-cased emails already taken, via the lower(email) index
+        return {
+            email.lower() for email in
+            CustomUser.objects
+            .filter(email__lower__in=list(keys))
+            .values_list('email', flat=True)
+        }
+
+    def flush(self, pending, checkpoint, started):
+        done, rows, hashes = pending
+        hashes = list(hashes)
+
+        with transaction.atomic():
+            # Catch rows inserted by the previous chunk since prepare()
+            existing = self.existing_emails(
+                row['email'].lower() for row in rows
+            )
+            users, profiles = [], []
+            for row, encoded in zip(rows, hashes):
+                if row['email'].lower() in existing:
+                    continue
+                user = CustomUser(
+                    email=row['email'],
+                    password=encoded,
+                    is_active=row['is_active'],
+                )
+                users.append(user)
+                profiles.append(
+                    CustomUserProfile(user=user, phone=row['phone'])
+                )
+            CustomUser.objects.bulk_create(users)
+            CustomUserProfile.objects.bulk_create(profiles)
+
+        self.write_checkpoint(checkpoint, done)
+        self.imported += len(users)
+        self.skipped += len(rows) - len(users)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'imported={self.imported} skipped={self.skipped} '
+            f'invalid={self.invalid} records={done} '
+            f'rows/sec={self.imported / elapsed:.0f}'
+        )
+        return done
+
+    def read_checkpoint(self, checkpoint):
+        try:
+            with open(checkpoint) as fh:
+                return json.load(fh)['records']
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError):
+            raise CommandError(f'Unreadable checkpoint {checkpoint}')
+
+    def write_checkpoint(self, checkpoint, done):
+        tmp = f'{checkpoint}.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump({'records': done}, fh)
+        os.replace(tmp, checkpoint)
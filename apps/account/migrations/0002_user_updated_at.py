@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['updated_at', 'id'], name='user_updated_at_id_idx'),
+        ),
+    ]
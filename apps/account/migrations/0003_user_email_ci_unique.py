@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:18
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_user_updated_at'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_email_ci_unique', violation_error_message='A user with this email already exists.'),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+    ]
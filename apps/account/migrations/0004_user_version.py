@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_user_email_ci_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_user_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='token_generation',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# lower(email) LIKE 'prefix%' (the admin search) can only use an index
+# built with text_pattern_ops when the database collation is not "C".
+# PostgreSQL only; the operator class does not exist elsewhere.
+
+from django.db import migrations
+
+INDEX = 'user_email_lower_prefix_idx'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX} '
+            'ON "User" (lower(email) text_pattern_ops)'
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_user_token_generation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -2,18 +2,31 @@
 from uuid import uuid4
 
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from apps.account.services.user_cache import invalidate_user
+
+
+# `email__lower=...` lookups, served by the lower(email) unique index
+models.EmailField.register_lookup(Lower)
+
 
 # Custom User Manager
 class CustomUserManager(BaseUserManager):
+    def get_by_natural_key(self, username):
+        # Case-insensitive, matching the database's idea of lower()
+        return self.get(email__lower=Lower(Value(username)))
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('Email must be provided to create a user')
@@ -47,9 +60,16 @@ class CustomUserManager(BaseUserManager):
 # Custom User
 class CustomUser(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
-    email = models.EmailField(unique=True, db_index=True)
+    # Unique case-insensitively, see Meta.constraints
+    email = models.EmailField()
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped on any change to the user or its profile; export/sync cursor
+    updated_at = models.DateTimeField(auto_now=True)
+    # Likewise bumped on every change; the /account/me ETag
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Tokens carry it as the `gen` claim; bumping it revokes them all
+    token_generation = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
@@ -60,10 +80,38 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         db_table = 'User'
         verbose_name = 'User'
         verbose_name_plural = 'User'
+        constraints = [
+            models.UniqueConstraint(
+                Lower('email'),
+                name='user_email_ci_unique',
+                violation_error_message=(
+                    'A user with this email already exists.'
+                ),
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['updated_at', 'id'], name='user_updated_at_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # Bumped in the UPDATE itself, so concurrent saves never reuse a
+        # version (and an ETag)
+        self.version = F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+        # Deferred: the new value is loaded only if something reads it
+        del self.__dict__['version']
+
 
 # User Profile
 class CustomUserProfile(models.Model):
@@ -91,3 +139,27 @@ def create_profile(sender, instance, created, **kwargs):
     if created:
         profile = CustomUserProfile(user=instance)
         profile.save()
+
+
+# Profile edits move the user forward in the export feed and change its
+# version. Connected before the cache invalidation below, so a request
+# racing the edit cannot re-cache the old version.
+@receiver(post_save, sender=CustomUserProfile)
+def touch_user(sender, instance, created, **kwargs):
+    if not created:
+        CustomUser.objects.filter(pk=instance.user_id).update(
+            updated_at=timezone.now(), version=F('version') + 1
+        )
+
+
+# Drop cached users when the row (or its profile) changes, and again once
+# the change commits, so e.g. deactivating a user in the admin takes effect
+# on the next request.
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CustomUserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
@@ -27,6 +27,18 @@ class UserReadSerializer(serializers.ModelSerializer):
     # nest the serializer
     profile = ProfileReadSerializer(read_only=True)
 
+    # Columns needed to render this serializer, for `.only()` lookups
+    load_fields = (
+        'id',
+        'email',
+        'is_staff',
+        'is_active',
+        'profile__phone',
+        'profile__is_phone_verified',
+        'profile__created_at',
+        'profile__updated_at',
+    )
+
     class Meta:
         model = CustomUser
         fields = (
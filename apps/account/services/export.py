@@ -0,0 +1,136 @@
+# apps/account/services/export.py
+
+import base64
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.account.models import CustomUser
+
+EXPORT_FIELDS = (
+    'id',
+    'email',
+    'is_active',
+    'is_staff',
+    'updated_at',
+    'profile__phone',
+    'profile__is_phone_verified',
+    'profile__created_at',
+    'profile__updated_at',
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(updated_at, pk) -> str:
+    raw = f'{updated_at.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Return the ``(updated_at, id)`` position encoded in ``cursor``.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        updated_at, pk = raw.decode().split('|')
+        updated_at = datetime.fromisoformat(updated_at)
+        if timezone.is_naive(updated_at):
+            raise ValueError
+        return updated_at, UUID(pk)
+    except ValueError:
+        raise InvalidCursor(f'Invalid cursor {cursor!r}')
+
+
+class UserExport:
+    """
+    Users and profiles in ``(updated_at, id)`` order, fetched in keyset
+    pages so memory stays flat however large the table is.
+
+    Rows newer than ``USER_EXPORT['SETTLE_SECONDS']`` are held back:
+    ``updated_at`` is set before commit, so a row may become visible after
+    a reader has already moved past its timestamp. When reading from a
+    replica, keep SETTLE_SECONDS above its replication lag.
+
+    The database is chosen once, on construction, since the stream is
+    consumed after the view (and its replica routing) has returned.
+    """
+
+    def __init__(self, since=None, page_size=None, limit=None, using=None):
+        conf = getattr(settings, 'USER_EXPORT', {})
+        self.position = decode_cursor(since) if since else None
+        self.page_size = page_size or conf.get('PAGE_SIZE', 1000)
+        self.limit = limit
+        self.until = timezone.now() - timedelta(
+            seconds=conf.get('SETTLE_SECONDS', 5)
+        )
+        self.cursor = since
+        self.count = 0
+        self.using = using or router.db_for_read(CustomUser)
+
+    def fetch_page(self):
+        size = self.page_size
+        if self.limit is not None:
+            size = min(size, self.limit - self.count)
+            if size <= 0:
+                return []
+
+        rows = (
+            CustomUser.objects
+            .using(self.using)
+            .filter(updated_at__lte=self.until)
+            .order_by('updated_at', 'id')
+            .values(*EXPORT_FIELDS)
+        )
+        if self.position:
+            updated_at, pk = self.position
+            rows = rows.filter(
+                Q(updated_at__gt=updated_at)
+                | Q(updated_at=updated_at, id__gt=pk)
+            )
+        page = [self.to_record(row) for row in rows[:size]]
+        if page:
+            last = page[-1]
+            self.position = last['updated_at'], last['id']
+            self.cursor = last['cursor']
+            self.count += len(page)
+        return page
+
+    def to_record(self, row):
+        return {
+            'id': row['id'],
+            'email': row['email'],
+            'is_active': row['is_active'],
+            'is_staff': row['is_staff'],
+            'updated_at': row['updated_at'],
+            'profile': {
+                'phone': row['profile__phone'],
+                'is_phone_verified': row['profile__is_phone_verified'],
+                'created_at': row['profile__created_at'],
+                'updated_at': row['profile__updated_at'],
+            } if row['profile__created_at'] else None,
+            'cursor': encode_cursor(row['updated_at'], row['id']),
+        }
+
+    def ndjson(self):
+        while page := self.fetch_page():
+            yield ''.join(dumps_line(record) for record in page)
+
+    async def andjson(self):
+        # ASGI would otherwise buffer a sync iterator in full
+        fetch_page = sync_to_async(self.fetch_page)
+        while page := await fetch_page():
+            yield ''.join(dumps_line(record) for record in page)
+
+
+def dumps_line(record) -> str:
+    return json.dumps(record, cls=DjangoJSONEncoder) + '\n'
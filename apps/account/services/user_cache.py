@@ -0,0 +1,176 @@
+# apps/account/services/user_cache.py
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+
+class UserCache:
+    """
+    Two-tier cache of user rows keyed by primary key.
+
+    The local tier is a bounded LRU with a TTL that lives in each worker
+    process. The optional shared tier is a Django cache alias, so a miss in
+    one worker can be served from a row another worker already loaded.
+    Shared entries are keyed by a per-user version that ``invalidate``
+    bumps, so a load that raced an invalidation can only write under a
+    version nobody reads any more. Local entries in *other* processes are
+    only bounded by their TTL, so keep ``TTL`` short when several workers
+    run.
+    """
+
+    key_prefix = 'user-cache:'
+
+    def __init__(
+        self, max_entries=10000, ttl=30, shared_cache=None, shared_ttl=300
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self.shared_ttl = shared_ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced with a write
+        # does not put the stale row back into the cache.
+        self._epoch = 0
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, user_id, loader):
+        """
+        Return a copy of the cached user, calling ``loader(user_id)`` on miss.
+        """
+        key = str(user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.copy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            epoch = self._epoch
+
+        shared_key = self._shared_key(key)
+        user = self._get_shared(shared_key)
+        if user is not None:
+            with self._lock:
+                self.shared_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            user = loader(user_id)
+            self._set_shared(shared_key, user)
+
+        self._store(key, user, epoch)
+        return copy.copy(user)
+
+    def peek(self, user_id):
+        """
+        Return a copy of the locally cached user, or None; never loads.
+        """
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self.hits += 1
+            return copy.copy(entry[1])
+
+    def invalidate(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._epoch += 1
+        if self.shared_cache:
+            cache = caches[self.shared_cache]
+            version_key = f'{self.key_prefix}v:{key}'
+            # No expiry: a reset version could revive an old entry
+            cache.add(version_key, 0, None)
+            cache.incr(version_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+            self.hits = self.shared_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+            }
+
+    def _store(self, key, user, epoch):
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _shared_key(self, key):
+        if not self.shared_cache:
+            return None
+        version = caches[self.shared_cache].get(f'{self.key_prefix}v:{key}', 0)
+        return f'{self.key_prefix}{key}:{version}'
+
+    def _get_shared(self, shared_key):
+        if shared_key is None:
+            return None
+        return caches[self.shared_cache].get(shared_key)
+
+    def _set_shared(self, shared_key, user):
+        if shared_key is not None:
+            caches[self.shared_cache].set(shared_key, user, self.shared_ttl)
+
+
+_user_cache = None
+
+
+def get_user_cache() -> UserCache:
+    """
+    Return the process-wide user cache configured by ``USER_CACHE``.
+    """
+    global _user_cache
+    if _user_cache is None:
+        conf = getattr(settings, 'USER_CACHE', {})
+        _user_cache = UserCache(
+            max_entries=conf.get('MAX_ENTRIES', 10000),
+            ttl=conf.get('TTL', 30),
+            shared_cache=conf.get('SHARED_CACHE'),
+            shared_ttl=conf.get('SHARED_TTL', 300),
+        )
+    return _user_cache
+
+
+def invalidate_user(user_id):
+    """
+    Drop ``user_id`` from the cache now, and again when the current
+    transaction commits: until then, other requests can still load (and
+    re-cache) the old committed row.
+    """
+    get_user_cache().invalidate(user_id)
+    transaction.on_commit(lambda: get_user_cache().invalidate(user_id))
+
+
+@receiver(setting_changed)
+def _reset_user_cache(setting, **kwargs):
+    global _user_cache
+    if setting == 'USER_CACHE':
+        _user_cache = None
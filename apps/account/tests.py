@@ -1,3 +1,293 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.account.models import CustomUser, CustomUserProfile
+from apps.account.services.export import decode_cursor
+from apps.account.services.user_cache import get_user_cache
+from apps.auth.tokens import AccessToken
+
+
+class UserRetrieveAPIViewTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = CustomUser.objects.create_user(
+            'user@example.com', 'S3cure-pass!'
+        )
+
+    def test_me_is_a_single_query(self):
+        # Bypass the JWT cache: the view itself must join the profile
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.get(pk=self.user.pk))
+
+        with self.assertNumQueries(1) as ctx:
+            response = client.get('/account/me')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['profile']['phone'], '')
+        self.assertNotIn('password', ctx.captured_queries[0]['sql'])
+
+    def test_me_with_cold_jwt_cache_is_a_single_query(self):
+        token = AccessToken.for_user(self.user)
+
+        with self.assertNumQueries(1) as ctx:
+            response = self.client.get(
+                '/account/me', HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+        self.assertEqual(response.status_code, 200)
+        # The cached user never carries the password hash
+        self.assertNotIn('password', ctx.captured_queries[0]['sql'])
+
+    def get_me(self, **headers):
+        token = AccessToken.for_user(self.user)
+        return self.client.get(
+            '/account/me',
+            headers={'Authorization': f'Bearer {token}', **headers}
+        )
+
+    def test_unchanged_user_is_not_modified(self):
+        response = self.get_me()
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        # The cached user carries everything the validators need
+        with self.assertNumQueries(0):
+            response = self.get_me(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        since = response['Last-Modified']
+        response = self.get_me(**{'If-Modified-Since': since})
+        self.assertEqual(response.status_code, 304)
+
+    def test_cold_cache_not_modified_is_a_single_query(self):
+        etag = self.get_me()['ETag']
+        get_user_cache().clear()
+
+        with self.assertNumQueries(1):
+            response = self.get_me(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_profile_and_user_changes_change_the_etag(self):
+        first = self.get_me()['ETag']
+
+        profile = self.user.profile
+        profile.phone = '+1234555678'
+        profile.save()
+        response = self.get_me(**{'If-None-Match': first})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['profile']['phone'], '+1234555678')
+
+        second = response['ETag']
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.is_staff = True
+        user.save()
+        response = self.get_me(**{'If-None-Match': second})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(response['ETag'], (first, second))
+
+    def test_user_without_profile(self):
+        self.user.profile.delete()
+
+        response = self.get_me()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['profile'])
+        response = self.get_me(**{'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_concurrent_saves_never_reuse_a_version(self):
+        first = CustomUser.objects.get(pk=self.user.pk)
+        second = CustomUser.objects.get(pk=self.user.pk)
+        first.is_staff = True
+        # The new version is only read back when asked for
+        with self.assertNumQueries(1):
+            first.save(update_fields=['is_staff'])
+        self.assertEqual(first.version, 2)
+        second.save()
+        self.assertEqual(second.version, 3)
+
+
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create_user('existing@example.com', 'S3cure-pass!')
+        tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        self.path = os.path.join(tmpdir, 'users.csv')
+        with open(self.path, 'w') as fh:
+            fh.write(
+                'email,password,phone,is_active\n'
+                'existing@example.com,S3cure-pass!,,1\n'
+                'not-an-email,S3cure-pass!,,1\n'
+                'a@example.com,S3cure-pass!,+2348000000000,1\n'
+                'A@example.com,other,,1\n'
+                'b@example.com,,,0\n'
+            )
+
+    def import_users(self, *args):
+        out = StringIO()
+        call_command(
+            'importusers', self.path, '--workers', '0', '--chunk-size', '2',
+            *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_imports_users_and_profiles(self):
+        out = self.import_users()
+
+        self.assertIn('Imported 2 users', out)
+        a = CustomUser.objects.get(email='a@example.com')
+        self.assertTrue(a.check_password('S3cure-pass!'))
+        self.assertEqual(a.profile.phone, '+2348000000000')
+        b = CustomUser.objects.get(email='b@example.com')
+        self.assertFalse(b.is_active)
+        self.assertFalse(b.has_usable_password())
+        self.assertEqual(CustomUserProfile.objects.count(), 3)
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+    def test_resumes_from_checkpoint(self):
+        with open(f'{self.path}.checkpoint', 'w') as fh:
+            json.dump({'records': 4}, fh)
+
+        out = self.import_users()
+
+        self.assertIn('Resuming after 4 records', out)
+        users = CustomUser.objects
+        self.assertTrue(users.filter(email='b@example.com').exists())
+        self.assertFalse(users.filter(email='a@example.com').exists())
+
+
+@override_settings(USER_EXPORT={'PAGE_SIZE': 2, 'SETTLE_SECONDS': 0})
+class UserExportTests(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(f'user{i}@example.com')
+            for i in range(5)
+        ]
+        staff = CustomUser.objects.create_user(
+            'staff@example.com', is_staff=True
+        )
+        self.auth = {
+            'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(staff)}'
+        }
+
+    def export(self, **params):
+        response = self.client.get('/account/export', params, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        return [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+
+    def test_requires_staff(self):
+        token = AccessToken.for_user(self.users[0])
+        response = self.client.get(
+            '/account/export', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_streams_every_user_in_keyset_order(self):
+        records = self.export()
+
+        self.assertEqual(len(records), 6)
+        keys = [decode_cursor(r['cursor']) for r in records]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(records[0]['profile']['phone'], '')
+
+    def test_since_cursor_returns_only_later_changes(self):
+        cursor = self.export()[-1]['cursor']
+        self.assertEqual(self.export(since=cursor), [])
+
+        profile = self.users[0].profile
+        profile.phone = '+2348000000000'
+        profile.save()
+
+        records = self.export(since=cursor)
+        self.assertEqual([r['email'] for r in records], ['user0@example.com'])
+        self.assertEqual(records[0]['profile']['phone'], '+2348000000000')
+
+    def test_rejects_bad_cursor(self):
+        response = self.client.get(
+            '/account/export', {'since': 'garbage'}, **self.auth
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_ndjson_and_next_cursor(self):
+        out, err = StringIO(), StringIO()
+        call_command('exportusers', '--limit', '3', stdout=out, stderr=err)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertIn(records[-1]['cursor'], err.getvalue())
+
+
+class UserAdminTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            'admin@example.com', 'S3cure-pass!'
+        )
+        self.users = [
+            CustomUser.objects.create_user(f'user{i}@example.com', 'pw')
+            for i in range(3)
+        ]
+        self.client.force_login(self.admin)
+
+    def test_log_out_everywhere_bumps_token_generation(self):
+        response = self.client.post('/admin/account/customuser/', {
+            'action': 'log_out_everywhere',
+            '_selected_action': [u.pk for u in self.users[:2]],
+        })
+        self.assertEqual(response.status_code, 302)
+        generations = [
+            CustomUser.objects.get(pk=u.pk).token_generation
+            for u in self.users
+        ]
+        self.assertEqual(generations, [1, 1, 0])
+
+    def changelist_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = [
+            '/admin/account/customuser/',
+            '/admin/account/customuserprofile/',
+        ]
+        before = [self.changelist_queries(url) for url in urls]
+        for i in range(3, 40):
+            CustomUser.objects.create_user(f'user{i}@example.com')
+        self.assertEqual(
+            [self.changelist_queries(url) for url in urls], before
+        )
+
+    def test_search_matches_email_prefix(self):
+        CustomUser.objects.create_user('other-user1@example.com')
+        response = self.client.get(
+            '/admin/account/customuser/', {'q': 'USER1'}
+        )
+        self.assertEqual(
+            [u.email for u in response.context['cl'].result_list],
+            ['user1@example.com'],
+        )
+
+        user_admin = admin.site._registry[CustomUser]
+        # The old range search had no upper bound past the last code point
+        queryset, _ = user_admin.get_search_results(
+            None, CustomUser.objects.all(), 'user1\U0010ffff'
+        )
+        self.assertFalse(queryset.exists())
+
+        if connection.vendor == 'postgresql':
+            queryset, _ = user_admin.get_search_results(
+                None, CustomUser.objects.all(), 'user1'
+            )
+            self.assertIn('user_email_lower_prefix_idx', queryset.explain())
@@ -1,7 +1,7 @@
 # Account url config
 from django.urls import path
 
-from apps.account.views import UserRetrieveAPIView
+from apps.account.views import UserRetrieveAPIView, user_export
 
 urlpatterns = [
     path(
@@ -9,4 +9,9 @@ urlpatterns = [
         UserRetrieveAPIView.as_view(),  # view
         name='user-detail'  # name
     ),
+    path(
+        'export',  # route
+        user_export,  # view
+        name='user-export'  # name
+    ),
 ]
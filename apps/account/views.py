@@ -2,17 +2,104 @@
 
 from typing import Any
 
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework import generics, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
+from .models import CustomUser
+from .services.export import InvalidCursor, UserExport
 from .serializers import UserReadSerializer
 
 
+# Columns behind the /account/me validators
+VALIDATOR_FIELDS = ('version', 'updated_at', 'profile__updated_at')
+
+
+def user_validators(user):
+    """
+    Return ``(etag, last_modified)`` for a user loaded with its profile.
+    Profile edits bump ``user.version`` too; its ``updated_at`` is mixed in
+    for writes that bypass signals (``QuerySet.update``). A user without a
+    profile falls back to its own ``updated_at``.
+    """
+    profile = getattr(user, 'profile', None)
+    changed_at = profile.updated_at if profile else user.updated_at
+    etag = f'"{user.version}.{int(changed_at.timestamp() * 1e6):x}"'
+    last_modified = max(user.updated_at, changed_at).timestamp()
+    return etag, int(last_modified)
+
+
 class UserRetrieveAPIView(generics.RetrieveAPIView):
     serializer_class = UserReadSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        """
+        The current user, with an ETag and Last-Modified; a matching
+        If-None-Match / If-Modified-Since gets 304 without serializing.
+        """
+        user = self.get_object()
+        etag, last_modified = user_validators(user)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(self.get_serializer(user).data)
+
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        # Clients may keep it, but must revalidate before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
     def get_object(self) -> Any:
         """
         Return the current authenticated user
         """
-        return self.request.user
+        user = self.request.user
+
+        # The cached JWT user already carries its profile
+        if CustomUser.profile.is_cached(user):
+            return user
+
+        # Otherwise load only the serialized columns, profile joined
+        return (
+            CustomUser.objects
+            .select_related('profile')
+            .only(*UserReadSerializer.load_fields, *VALIDATOR_FIELDS)
+            .get(pk=user.pk)
+        )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def user_export(request) -> StreamingHttpResponse:
+    """
+    Stream users and profiles as NDJSON in ``(updated_at, id)`` order.
+    Pass the last record's ``cursor`` as ``?since=`` to fetch only what
+    changed after it; ``?limit=`` caps the number of records.
+    """
+    limit = request.query_params.get('limit')
+    try:
+        limit = int(limit) if limit else None
+    except ValueError:
+        raise ValidationError({'limit': ['A valid integer is required.']})
+
+    try:
+        export = UserExport(
+            since=request.query_params.get('since'), limit=limit
+        )
+    except InvalidCursor as e:
+        raise ValidationError({'since': [str(e)]})
+
+    if isinstance(request._request, ASGIRequest):
+        stream = export.andjson()
+    else:
+        stream = export.ndjson()
+    return StreamingHttpResponse(stream, content_type='application/x-ndjson')
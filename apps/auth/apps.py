@@ -5,3 +5,6 @@ class CustomAuthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.auth"
     label = 'custom_auth'
+
+    def ready(self):
+        from apps.auth import checks, signals  # noqa: F401
@@ -0,0 +1,60 @@
+# apps/auth/authentication.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.account.services.user_cache import get_user_cache
+from apps.auth.services.generations import is_current_generation, load_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through the user cache
+    instead of querying the User table on every request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        try:
+            user = get_user_cache().get(user_id, self.load_user)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+
+        # "Log out everywhere" bumps the user's generation
+        if not is_current_generation(validated_token, user):
+            raise AuthenticationFailed(
+                _('Token has been revoked'), code='token_revoked'
+            )
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."),
+                    code='password_changed'
+                )
+
+        return user
+
+    def load_user(self, user_id):
+        return load_user(user_id)
@@ -0,0 +1,31 @@
+# apps/auth/checks.py
+
+from django.conf import settings
+from django.core.checks import Error, register
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from apps.auth.password_validation import BreachedPasswordValidator
+
+
+@register()
+def check_breached_corpus(app_configs, **kwargs):
+    """
+    Open every configured breached-password corpus, so a missing or
+    corrupt ``BREACHED_PASSWORDS_FILE`` fails at deploy time.
+    """
+    errors = []
+    for validator in settings.AUTH_PASSWORD_VALIDATORS:
+        cls = import_string(validator['NAME'])
+        if not issubclass(cls, BreachedPasswordValidator):
+            continue
+        try:
+            cls(**validator.get('OPTIONS', {}))
+        except ImproperlyConfigured as e:
+            errors.append(Error(
+                str(e),
+                hint='Set BREACHED_PASSWORDS_FILE to a file built by '
+                     'buildbreachedcorpus.',
+                id='custom_auth.E001',
+            ))
+    return errors
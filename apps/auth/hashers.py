@@ -0,0 +1,22 @@
+# apps/auth/hashers.py
+
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from apps.core.utils.metrics import observe_password_hash
+
+
+class TimedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's default hasher, timed for the ``password_hash_seconds`` metric.
+    Same algorithm name, so existing hashes verify unchanged (``verify``
+    and ``harden_runtime`` go through ``encode``).
+    """
+
+    def encode(self, password, salt, iterations=None):
+        start = time.perf_counter()
+        try:
+            return super().encode(password, salt, iterations)
+        finally:
+            observe_password_hash(time.perf_counter() - start)
@@ -0,0 +1,108 @@
+# apps/auth/management/commands/bench_breached.py
+
+import os
+import random
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from apps.auth.services.breached import (
+    DIGEST_SIZE,
+    HEADER,
+    BreachedCorpus,
+    write_corpus,
+)
+from apps.core.utils.bench import summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Time BreachedCorpus lookups (hits and misses) against a synthetic "
+        "corpus of --entries uniformly spread hashes, or an existing one"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=10_000_000)
+        parser.add_argument('--prefix-bytes', type=int, default=DIGEST_SIZE)
+        parser.add_argument('--lookups', type=int, default=100_000)
+        parser.add_argument(
+            '--path', help='Benchmark this corpus instead of building one'
+        )
+
+    def handle(self, *args, **options):
+        if options['path']:
+            self.bench(options['path'], options['lookups'])
+            return
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'corpus.bin')
+            write_corpus(
+                path,
+                self.synthetic(options['entries']),
+                options['prefix_bytes'],
+            )
+            self.bench(path, options['lookups'])
+
+    def synthetic(self, entries):
+        # Sorted by construction: one random value per equal slice
+        step = (1 << DIGEST_SIZE * 8) // max(entries, 1)
+        for i in range(entries):
+            value = i * step + random.randrange(step)
+            yield value.to_bytes(DIGEST_SIZE, 'big')
+
+    def bench(self, path, lookups):
+        corpus = BreachedCorpus(path)
+        size = corpus.record_size
+        hits = []
+        sample = random.sample(range(len(corpus)), min(lookups, len(corpus)))
+        with open(path, 'rb') as fh:
+            for i in sample:
+                fh.seek(HEADER.size + i * size)
+                hits.append(fh.read(size))
+        misses = [os.urandom(DIGEST_SIZE) for _ in range(lookups)]
+
+        results = {
+            'hit': summarize(timed(lambda i: hits[i] in corpus, len(hits))),
+            'miss': summarize(timed(lambda i: misses[i] in corpus, lookups)),
+            'password': summarize(timed(
+                lambda i: corpus.contains_password(f'password{i}'), lookups
+            )),
+        }
+
+        self.stdout.write(
+            f'corpus: {len(corpus)} hashes x {size} bytes '
+            f'({os.path.getsize(path) / 2**20:.0f} MiB)'
+        )
+        for name, summary in results.items():
+            self.stdout.write(
+                f'{name:>8}: {1e6 / summary["ops_per_sec"]:.2f}us/lookup '
+                f'p99={summary["p99_ms"] * 1000:.2f}us'
+            )
+
+        # Memory of a fresh mapping after the same lookups, untimed.
+        # Touched pages show up as RssFile: page cache, shared by every
+        # worker. RssAnon is this process's own memory.
+        before = self.rss()
+        fresh = BreachedCorpus(path)
+        for digest in hits + misses:
+            digest in fresh
+        after = self.rss()
+        for field, kb in after.items():
+            self.stdout.write(
+                f'{field:>8}: +{(kb - before[field]) / 1024:.1f} MiB'
+            )
+
+    def rss(self):
+        """
+        ``{'RssAnon': kB, 'RssFile': kB}`` from /proc (Linux), else empty.
+        """
+        try:
+            with open('/proc/self/status') as fh:
+                lines = fh.readlines()
+        except OSError:
+            return {}
+        return {
+            name: int(value.split()[0])
+            for name, _sep, value in (line.partition(':') for line in lines)
+            if name in ('RssAnon', 'RssFile')
+        }
@@ -0,0 +1,72 @@
+# apps/auth/management/commands/bench_revocation.py
+
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.account.models import CustomUser
+from apps.auth.serializers import TokenVerifySerializer
+from apps.auth.services.revocation import get_revocation_index
+from apps.auth.tokens import RefreshToken
+from apps.core.utils.bench import isolated_database, summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare token verify throughput with DB-only blacklist lookups "
+        "against the in-memory revocation index (uses a throwaway database)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=2000)
+        parser.add_argument('--blacklisted', type=int, default=50000)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            tokens = self.seed(options['tokens'], options['blacklisted'])
+            get_revocation_index().rebuild()
+
+            results = {
+                'db_only': self.run(
+                    jwt_serializers.TokenVerifySerializer, tokens
+                ),
+                'indexed': self.run(TokenVerifySerializer, tokens),
+            }
+
+        for name, summary in results.items():
+            self.stdout.write(f'{name:>8}: {summary}')
+        speedup = (
+            results['indexed']['ops_per_sec']
+            / results['db_only']['ops_per_sec']
+        )
+        self.stdout.write(f'speedup: {speedup:.2f}x')
+        self.stdout.write(f'index: {get_revocation_index().stats()}')
+
+    def seed(self, token_count, blacklisted_count):
+        user = CustomUser.objects.create_user('bench@example.com')
+        expires_at = aware_utcnow() + timedelta(days=30)
+
+        outstanding = OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=user, jti=uuid4().hex, token='', expires_at=expires_at
+            )
+            for _ in range(blacklisted_count)
+        )
+        BlacklistedToken.objects.bulk_create(
+            BlacklistedToken(token=token) for token in outstanding
+        )
+        return [str(RefreshToken.for_user(user)) for _ in range(token_count)]
+
+    def run(self, serializer_class, tokens):
+        def verify(i):
+            serializer = serializer_class(data={'token': tokens[i]})
+            serializer.is_valid(raise_exception=True)
+
+        return summarize(timed(verify, len(tokens)))
@@ -0,0 +1,137 @@
+# apps/auth/management/commands/bench_verifyserver.py
+
+import asyncio
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+
+from apps.account.models import CustomUser
+from apps.auth.services.revocation import get_revocation_index
+from apps.auth.services.verify_server import VerifyServer
+from apps.auth.tokens import AccessToken
+from apps.core.utils import fastjson
+from apps.core.utils.bench import isolated_database, summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare token verification through the full Django stack "
+        "(/auth/token/verify/, in-process test Client) with the standalone "
+        "verify server (over loopback TCP with keep-alive), on a throwaway "
+        "database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=4)
+
+    def handle(self, *args, **options):
+        # One client IP for every request: keep the verify throttles out
+        with override_settings(RATE_LIMITS={}), isolated_database():
+            tokens = self.seed(options['users'])
+            tokens = [
+                tokens[i % len(tokens)] for i in range(options['requests'])
+            ]
+            get_revocation_index().rebuild()
+
+            with self.verify_server() as (verifier, port):
+                for name, run in (
+                    ('django', self.run_django),
+                    ('sidecar', lambda share: self.run_sidecar(port, share)),
+                ):
+                    run(tokens[:len(tokens) // 10])  # warm caches
+                    for concurrency in (1, options['concurrency']):
+                        summary = self.run(run, tokens, concurrency)
+                        self.stdout.write(
+                            f'{name:>8} x{concurrency}: {summary}'
+                        )
+                self.stdout.write(
+                    f'sidecar checks: {verifier.in_memory} in memory, '
+                    f'{verifier.with_database} with the database'
+                )
+
+    def seed(self, count):
+        encoded = make_password(None)
+        users = CustomUser.objects.bulk_create(
+            CustomUser(email=f'user{i}@example.com', password=encoded)
+            for i in range(count)
+        )
+        return [str(AccessToken.for_user(user)) for user in users]
+
+    @contextmanager
+    def verify_server(self):
+        """
+        Run a ``VerifyServer`` on its own event loop thread; yields
+        ``(verifier, port)``.
+        """
+        loop = asyncio.new_event_loop()
+        verifier = VerifyServer()
+        server = loop.run_until_complete(verifier.start(port=0))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            yield verifier, server.sockets[0].getsockname()[1]
+        finally:
+            asyncio.run_coroutine_threadsafe(
+                self.stop(server, verifier), loop
+            ).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    async def stop(self, server, verifier):
+        server.close()
+        await server.wait_closed()
+        await verifier.close()
+
+    def run(self, run, tokens, concurrency):
+        shares = [tokens[i::concurrency] for i in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = [
+                latency
+                for share in pool.map(run, shares)
+                for latency in share
+            ]
+        return summarize(latencies, time.perf_counter() - started)
+
+    def run_django(self, tokens):
+        client = Client()
+
+        def verify(i):
+            response = client.post(
+                '/auth/token/verify/', {'token': tokens[i]},
+                content_type='application/json',
+            )
+            if response.status_code != 200:
+                raise CommandError(f'django: {response.status_code}')
+
+        try:
+            return timed(verify, len(tokens))
+        finally:
+            connections.close_all()
+
+    def run_sidecar(self, port, tokens):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        headers = {'Content-Type': 'application/json'}
+
+        def verify(i):
+            body = fastjson.dumps({'token': tokens[i]})
+            conn.request('POST', '/verify', body, headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                raise CommandError(f'sidecar: {response.status}')
+
+        try:
+            return timed(verify, len(tokens))
+        finally:
+            conn.close()
@@ -0,0 +1,85 @@
+# apps/auth/management/commands/generatesigningkey.py
+
+import os
+import secrets
+from datetime import date
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+GENERATORS = {
+    'RS256': lambda: rsa.generate_private_key(
+        public_exponent=65537, key_size=2048
+    ),
+    'ES256': lambda: ec.generate_private_key(ec.SECP256R1()),
+    'EdDSA': ed25519.Ed25519PrivateKey.generate,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Add a new JWT signing key to JWT_KEYS_DIR, or retire an existing "
+        "one to public-only (it keeps verifying but no longer signs)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--algorithm', choices=sorted(GENERATORS), default='RS256'
+        )
+        parser.add_argument('--kid', help='Key id (default: date + random)')
+        parser.add_argument(
+            '--dir', help='Key directory (default: JWT_SIGNING_KEYS KEYS_DIR)'
+        )
+        parser.add_argument(
+            '--retire', metavar='KID',
+            help='Replace the private key KID with its public key'
+        )
+
+    def handle(self, *args, **options):
+        keys_dir = options['dir'] or settings.JWT_SIGNING_KEYS.get('KEYS_DIR')
+        if not keys_dir:
+            raise CommandError('Set JWT_KEYS_DIR or pass --dir')
+        keys_dir = Path(keys_dir)
+        keys_dir.mkdir(parents=True, exist_ok=True)
+
+        if options['retire']:
+            return self.retire(keys_dir / f"{options['retire']}.pem")
+
+        kid = options['kid'] or (
+            f'{date.today():%Y%m%d}-{secrets.token_hex(4)}'
+        )
+        path = keys_dir / f'{kid}.pem'
+        if path.exists():
+            raise CommandError(f'{path} already exists')
+
+        key = GENERATORS[options['algorithm']]()
+        pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(pem)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {options["algorithm"]} key {kid} at {path}'
+        ))
+
+    def retire(self, path):
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+
+        private_key = serialization.load_pem_private_key(
+            path.read_bytes(), password=None
+        )
+        path.write_bytes(private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Retired {path.stem}; it now only verifies tokens'
+        ))
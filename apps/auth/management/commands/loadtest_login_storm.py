@@ -0,0 +1,130 @@
+# apps/auth/management/commands/loadtest_login_storm.py
+
+import asyncio
+import time
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenVerifyView
+
+from apps.account.models import CustomUser
+from apps.auth.tokens import AccessToken
+from apps.auth.views.token import token_obtain_pair
+from apps.core.utils.bench import isolated_database, summarize
+
+PASSWORD = 'S3cure-pass!'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure /auth/token/verify/ latency on its own and during a storm "
+        "of concurrent logins, for the sync and async token-obtain views "
+        "(uses a throwaway database)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verifies', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--with-rate-limits', action='store_true',
+            help='Keep RATE_LIMITS (off by default: one client IP)'
+        )
+        parser.add_argument(
+            '--with-admission-control', action='store_true',
+            help='Keep ADMISSION_CONTROL (off by default, so the storm shows '
+                 'latency rather than 503s)'
+        )
+
+    def handle(self, *args, **options):
+        overrides = {}
+        if not options['with_rate_limits']:
+            overrides['RATE_LIMITS'] = {}
+        if not options['with_admission_control']:
+            overrides['ADMISSION_CONTROL'] = {}
+        # 429s and 503s (with the limits kept) are counted, not fatal
+        self.rejected = {}
+
+        with override_settings(**overrides), isolated_database():
+            user = CustomUser.objects.create_user(
+                'storm@example.com', PASSWORD
+            )
+            self.token = str(AccessToken.for_user(user))
+            self.factory = AsyncRequestFactory()
+
+            sync_login = sync_to_async(TokenObtainPairView.as_view())
+            results = asyncio.run(self.run_all(
+                options['verifies'], options['concurrency'], {
+                    'sync': sync_login,
+                    'async': token_obtain_pair,
+                }
+            ))
+
+        for name, summary in results.items():
+            self.stdout.write(f'{name:>14}: {summary}')
+        for name, statuses in self.rejected.items():
+            self.stdout.write(self.style.WARNING(
+                f'{name:>14}: rejected {statuses}'
+            ))
+
+    def count_status(self, name, response):
+        status = response.status_code
+        if status in (429, 503):
+            counts = self.rejected.setdefault(name, {})
+            counts[status] = counts.get(status, 0) + 1
+        elif status != 200:
+            raise CommandError(f'{name}: {status}')
+
+    async def run_all(self, verifies, concurrency, login_views):
+        results = {
+            'verify (idle)': await self.verify_latency('idle', verifies)
+        }
+        for mode, view in login_views.items():
+            logins = []
+            stop = asyncio.Event()
+            started = time.perf_counter()
+            storm = [
+                asyncio.create_task(
+                    self.login_loop(mode, view, stop, logins)
+                )
+                for _ in range(concurrency)
+            ]
+            results[f'verify ({mode})'] = await self.verify_latency(
+                mode, verifies
+            )
+            stop.set()
+            await asyncio.gather(*storm)
+            results[f'login ({mode})'] = summarize(
+                logins, time.perf_counter() - started
+            )
+        return results
+
+    async def verify_latency(self, mode, count):
+        view = sync_to_async(TokenVerifyView.as_view())
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(count):
+            request = self.factory.post(
+                '/auth/token/verify/', {'token': self.token},
+                content_type='application/json'
+            )
+            start = time.perf_counter()
+            async with ThreadSensitiveContext():
+                response = await view(request)
+            latencies.append(time.perf_counter() - start)
+            self.count_status(f'verify ({mode})', response)
+        return summarize(latencies, time.perf_counter() - started)
+
+    async def login_loop(self, mode, view, stop, latencies):
+        while not stop.is_set():
+            request = self.factory.post(
+                '/auth/token/', {
+                    'email': 'storm@example.com', 'password': PASSWORD,
+                },
+                content_type='application/json'
+            )
+            start = time.perf_counter()
+            async with ThreadSensitiveContext():
+                response = await view(request)
+            latencies.append(time.perf_counter() - start)
+            self.count_status(f'login ({mode})', response)
@@ -0,0 +1,114 @@
+# apps/auth/management/commands/purgeexpiredtokens.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.auth.models import DeviceSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding (and blacklisted) tokens in id order, "
+        "then expired device sessions in primary key order, in small "
+        "batches. Each batch commits on its own, so the command can be "
+        "interrupted and rerun; --resume-after skips the tokens already "
+        "processed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows deleted per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.0,
+            help='Seconds to pause between batches to yield to writers'
+        )
+        parser.add_argument(
+            '--resume-after', type=int, default=0,
+            help='Skip tokens with id <= this value (last id of a prior run)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = options['resume_after']
+        # Fix the cutoff so the scan converges on a moving table
+        cutoff = aware_utcnow()
+
+        deleted = blacklisted = 0
+        started = time.monotonic()
+        try:
+            while True:
+                ids = list(
+                    OutstandingToken.objects
+                    .filter(id__gt=last_id, expires_at__lte=cutoff)
+                    .order_by('id')
+                    .values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+
+                with transaction.atomic():
+                    _total, per_model = (
+                        OutstandingToken.objects.filter(id__in=ids).delete()
+                    )
+                deleted += per_model.get(OutstandingToken._meta.label, 0)
+                blacklisted += per_model.get(BlacklistedToken._meta.label, 0)
+                last_id = ids[-1]
+
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f'deleted={deleted} blacklisted={blacklisted} '
+                    f'last_id={last_id} rows/sec={deleted / elapsed:.0f}'
+                )
+
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+
+            sessions = self.purge_sessions(
+                cutoff, batch_size, options['sleep']
+            )
+        except KeyboardInterrupt:
+            self.stderr.write(
+                f'Interrupted; resume with --resume-after {last_id}'
+            )
+            return
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {deleted} expired tokens and {sessions} expired '
+            f'sessions in {elapsed:.1f}s'
+        ))
+
+    def purge_sessions(self, cutoff, batch_size, sleep):
+        deleted = 0
+        last_pk = None
+        while True:
+            sessions = DeviceSession.objects.filter(expires_at__lte=cutoff)
+            if last_pk is not None:
+                sessions = sessions.filter(pk__gt=last_pk)
+            pks = list(
+                sessions.order_by('pk').values_list('pk', flat=True)[
+                    :batch_size
+                ]
+            )
+            if not pks:
+                return deleted
+
+            with transaction.atomic():
+                count, _per_model = (
+                    DeviceSession.objects.filter(pk__in=pks).delete()
+                )
+            deleted += count
+            last_pk = pks[-1]
+            self.stdout.write(f'sessions deleted={deleted}')
+
+            if sleep:
+                time.sleep(sleep)
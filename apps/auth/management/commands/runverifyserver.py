@@ -0,0 +1,60 @@
+# apps/auth/management/commands/runverifyserver.py
+
+import asyncio
+import os
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.auth.services.verify_server import VerifyServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the standalone token verification server (POST /verify, "
+        "GET /verify with a bearer token, GET /health) on a localhost port "
+        "or a Unix socket, sharing SIMPLE_JWT, the signing keys and the "
+        "revocation data with the main service"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--socket', help='Listen on this Unix socket instead of a port'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Threads for checks that need the database'
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self.serve(options))
+
+    async def serve(self, options):
+        path = options['socket']
+        if path and os.path.exists(path):
+            os.remove(path)  # left behind by a previous run
+
+        verifier = VerifyServer(workers=options['workers'])
+        server = await verifier.start(
+            host=options['host'], port=options['port'], path=path
+        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        where = path or f'http://{options["host"]}:{options["port"]}'
+        self.stdout.write(self.style.SUCCESS(f'Verifying tokens on {where}'))
+        try:
+            await stop.wait()
+        finally:
+            server.close()
+            await verifier.close()
+            if path and os.path.exists(path):
+                os.remove(path)
+        self.stdout.write(
+            f'Stopped: {verifier.in_memory} checked in memory, '
+            f'{verifier.with_database} with the database'
+        )
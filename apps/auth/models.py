@@ -0,0 +1,39 @@
+# apps/auth/models.py
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import models
+
+
+# One per signed-in device; the refresh token carries its id as `sid`
+class DeviceSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    # Leading column of the (user, expires_at) index below
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='device_sessions',
+        db_index=False,
+    )
+    # Moved to the new token in place on every rotation
+    refresh_jti = models.CharField(max_length=255)
+    device = models.CharField(max_length=255, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'DeviceSession'
+        verbose_name = 'Device session'
+        verbose_name_plural = 'Device sessions'
+        indexes = [
+            models.Index(
+                fields=['user', 'expires_at'],
+                name='session_user_expires_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.device or "Unknown device"} ({self.user_id})'
@@ -0,0 +1,35 @@
+# apps/auth/password_validation.py
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.utils.translation import gettext as _
+
+from apps.auth.services.breached import InvalidCorpus, get_breached_corpus
+
+
+class BreachedPasswordValidator:
+    """
+    Reject passwords whose SHA-1 is in a local breached-password corpus
+    (``path``, built by ``buildbreachedcorpus``). No network access; the
+    file is memory-mapped when the validator is created and shared between
+    workers. A missing or corrupt file raises ``ImproperlyConfigured``
+    here (and fails ``manage.py check``), not on the first registration.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.corpus = get_breached_corpus(path)
+        except (OSError, InvalidCorpus) as e:
+            raise ImproperlyConfigured(
+                f'Cannot open the breached-password corpus: {e}'
+            )
+
+    def validate(self, password, user=None):
+        if self.corpus.contains_password(password):
+            raise ValidationError(
+                _('This password has appeared in a data breach.'),
+                code='password_breached',
+            )
+
+    def get_help_text(self):
+        return _('Your password can’t be one exposed in a data breach.')
@@ -1,14 +1,43 @@
 # apps/account/serializers.py
 
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 
 from apps.account.models import CustomUser
+from apps.auth.models import DeviceSession
+from apps.auth.services.generations import (
+    GENERATION_CLAIM,
+    check_generation,
+    current_generations,
+)
+from apps.auth.services.last_login import get_last_login_buffer
+from apps.auth.services.registration import (
+    InvalidRegistration,
+    get_otp_sender,
+    issue_registration,
+    verify_registration,
+)
+from apps.auth.services.revocation import get_revocation_index
+from apps.auth.services.sessions import (
+    SESSION_CLAIM,
+    start_session,
+    touch_session,
+)
+from apps.auth.tokens import RefreshToken, UntypedToken
 
 
-# Registration Serializer
-class RegistrationSerializer(serializers.ModelSerializer):
+# Registration Start Serializer
+class RegistrationStartSerializer(serializers.Serializer):
+    email = serializers.EmailField()
     # Allows 3rd party auth
     password = serializers.CharField(
         write_only=True, required=False, allow_null=True, allow_blank=True
@@ -17,12 +46,6 @@ class RegistrationSerializer(serializers.ModelSerializer):
         write_only=True, required=False, allow_null=True, allow_blank=True
     )
 
-    class Meta:
-        model = CustomUser
-        fields = ('id', 'email', 'password', 'confirm_password')
-        read_only_fields = ('id',)
-        extra_kwargs = {'email': {'required': True}}
-
     # Validate password
     def validate(self, attrs):
         pw = attrs.get('password') or ''
@@ -39,22 +62,237 @@ class RegistrationSerializer(serializers.ModelSerializer):
             except DjangoValidationError as e:
                 raise serializers.ValidationError({'password': e.messages})
 
+        attrs['email'] = CustomUser.objects.normalize_email(attrs['email'])
         return attrs
 
     def create(self, validated_data):
-        # Pull out password fields
-        pw = validated_data.pop('password', '')
-        _ = validated_data.pop('confirm_password', '')
+        """
+        Send the one-time code and return the signed registration payload.
+        Writes nothing to the database.
+        """
+        # Already hashed off-thread by the async view
+        password_hash = validated_data.get('password_hash')
+        if password_hash is None and validated_data.get('password'):
+            password_hash = make_password(validated_data['password'])
+
+        email = validated_data['email']
+        payload, otp = issue_registration(email, password_hash)
+        get_otp_sender().send(email, otp)
+        return payload
+
 
-        # Instantiate (but don't hit unique constraints twice)
-        user = CustomUser(email=validated_data['email'])
-        user.save()
+# Registration Confirm Serializer
+class RegistrationConfirmSerializer(serializers.Serializer):
+    id = serializers.UUIDField(read_only=True)
+    email = serializers.EmailField()
+    otp = serializers.CharField(write_only=True, max_length=12)
+    payload = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        # Signature, expiry and code are checked before any query
+        try:
+            attrs['claims'] = verify_registration(
+                attrs['payload'], attrs['email'], attrs['otp']
+            )
+        except InvalidRegistration as e:
+            raise serializers.ValidationError(str(e))
+        return attrs
+
+    def create(self, validated_data):
+        claims = validated_data['claims']
+        user = CustomUser(email=claims['email'])
 
         # Handle password or mark unusable
-        if pw:
-            user.set_password(pw)
+        if claims['password']:
+            user.password = claims['password']
         else:
             user.set_unusable_password()
 
-        user.save()
+        # One INSERT plus the profile's; the lower(email) index is the
+        # uniqueness check, so there is no SELECT beforehand
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'email': [_('A user with this email already exists.')]
+            })
         return user
+
+
+# Token Obtain Serializer
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        # Skip the parent's token issuing; authenticate() only
+        data = jwt_serializers.TokenObtainSerializer.validate(self, attrs)
+        data.update(
+            self.issue_tokens(self.user, self.context.get('request'))
+        )
+        return data
+
+    @classmethod
+    def issue_tokens(cls, user, request=None):
+        """
+        Return a fresh refresh/access pair for an authenticated user,
+        starting a device session for it.
+        """
+        refresh, _session = start_session(user, request, cls.token_class)
+
+        # Written behind, in batches (LAST_LOGIN)
+        get_last_login_buffer().record(user)
+
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+# Token Refresh Serializer
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        # Blacklist check runs through the revocation index
+        refresh = self.token_class(attrs['refresh'])
+
+        # Read from the primary, not the user cache: a refresh is where a
+        # deactivation or "log out everywhere" on another worker must take
+        # effect, so it cannot wait out USER_CACHE['TTL'].
+        user = check_generation(refresh.payload, fresh=True)
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        data = {'access': str(refresh.access_token)}
+
+        if not api_settings.ROTATE_REFRESH_TOKENS:
+            # Also rejects tokens of revoked sessions
+            touch_session(refresh)
+            return data
+
+        rotated = self.token_class(attrs['refresh'], verify=False)
+        rotated.set_jti()
+        rotated.set_exp()
+        rotated.set_iat()
+
+        with transaction.atomic():
+            # Rejects tokens of revoked sessions before anything else is
+            # written; rolled back if the blacklist insert below fails
+            touch_session(rotated)
+
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                # The index may lag other workers by SYNC_INTERVAL; the
+                # blacklist insert is authoritative, so a token that was
+                # already blacklisted cannot be rotated twice.
+                _blacklisted, created = refresh.blacklist()
+                if not created:
+                    raise TokenError(_('Token is blacklisted'))
+
+            rotated.outstand()
+
+        data['refresh'] = str(rotated)
+        return data
+
+
+# Token Verify Serializer
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+
+        if (
+            api_settings.BLACKLIST_AFTER_ROTATION
+            and 'rest_framework_simplejwt.token_blacklist'
+            in settings.INSTALLED_APPS
+        ):
+            jti = token.get(api_settings.JTI_CLAIM)
+            if get_revocation_index().is_revoked(jti):
+                raise serializers.ValidationError('Token is blacklisted')
+
+        check_generation(token.payload)
+        return {}
+
+
+# Batch Token Verify Serializer
+class TokenVerifyBatchSerializer(serializers.Serializer):
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        write_only=True,
+    )
+
+    def validate_tokens(self, value):
+        limit = settings.TOKEN_VERIFY_BATCH_MAX
+        if len(value) > limit:
+            raise serializers.ValidationError(
+                _('Ensure this field has no more than %(limit)s elements.')
+                % {'limit': limit}
+            )
+        return value
+
+    def validate(self, attrs):
+        results = []
+        jtis = {}
+        for raw in attrs['tokens']:
+            try:
+                token = UntypedToken(raw)
+            except TokenError as e:
+                results.append({'valid': False, 'error': str(e.args[0])})
+                continue
+            results.append({'valid': True, 'claims': token.payload})
+            jti = token.get(api_settings.JTI_CLAIM)
+            if jti is not None:
+                jtis.setdefault(jti, []).append(len(results) - 1)
+
+        # One IN query for every possibly-revoked token in the batch
+        if api_settings.BLACKLIST_AFTER_ROTATION and jtis:
+            for jti in get_revocation_index().revoked_among(list(jtis)):
+                for i in jtis[jti]:
+                    results[i] = {
+                        'valid': False, 'error': 'Token is blacklisted'
+                    }
+
+        # Cached generations, plus at most one query for the rest
+        user_claim = api_settings.USER_ID_CLAIM
+        claims = [
+            result['claims'] for result in results
+            if result['valid'] and user_claim in result['claims']
+        ]
+        generations = current_generations(c[user_claim] for c in claims)
+        for i, result in enumerate(results):
+            if not result['valid'] or user_claim not in result['claims']:
+                continue
+            claims = result['claims']
+            generation = generations.get(str(claims[user_claim]))
+            if generation is None:
+                results[i] = {'valid': False, 'error': 'User not found'}
+            elif claims.get(GENERATION_CLAIM, 0) < generation:
+                results[i] = {
+                    'valid': False, 'error': 'Token has been revoked'
+                }
+
+        return {'results': results}
+
+
+# Device Session Serializer
+class DeviceSessionSerializer(serializers.ModelSerializer):
+    # The session the request's access token belongs to
+    current = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DeviceSession
+        fields = [
+            'id',
+            'device',
+            'ip_address',
+            'created_at',
+            'last_used_at',
+            'expires_at',
+            'current',
+        ]
+
+    def get_current(self, session) -> bool:
+        token = getattr(self.context.get('request'), 'auth', None)
+        return token is not None and (
+            token.get(SESSION_CLAIM) == str(session.pk)
+        )
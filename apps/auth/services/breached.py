@@ -0,0 +1,166 @@
+# apps/auth/services/breached.py
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+# File layout: this header, then `count` records of `record_size` bytes,
+# each the first `record_size` bytes of a SHA-1 digest, sorted ascending
+# with no duplicates.
+MAGIC = b'BRPW'
+VERSION = 1
+HEADER = struct.Struct('>4sBB2x')
+DIGEST_SIZE = hashlib.sha1().digest_size
+
+
+class InvalidCorpus(ValueError):
+    pass
+
+
+class BreachedCorpus:
+    """
+    Read-only, memory-mapped view of a corpus file written by
+    ``write_corpus`` (see ``buildbreachedcorpus``).
+
+    Lookups search the mapping (see ``__contains__``), touching a handful
+    of pages. The pages are shared by every process mapping the same file,
+    so a worker's own memory does not grow with the corpus.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fh:
+            try:
+                self._map = mmap.mmap(
+                    fh.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError:
+                raise InvalidCorpus(f'{path} is empty')
+
+        if len(self._map) < HEADER.size:
+            raise InvalidCorpus(f'{path} is not a breached-password corpus')
+        magic, version, record_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise InvalidCorpus(f'{path} is not a breached-password corpus')
+        if not 0 < record_size <= DIGEST_SIZE:
+            raise InvalidCorpus(f'{path} has invalid record size')
+        body = len(self._map) - HEADER.size
+        if body % record_size:
+            raise InvalidCorpus(f'{path} is truncated')
+
+        self.record_size = record_size
+        self.count = body // record_size
+        # Probes jump across the file; don't read ahead around them
+        if hasattr(mmap, 'MADV_RANDOM'):
+            self._map.madvise(mmap.MADV_RANDOM)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, digest) -> bool:
+        """
+        Return True if the SHA-1 ``digest`` (or its prefix) is in the corpus.
+
+        Hashes are uniformly distributed, so each probe is placed where the
+        key should be by interpolation; a probe that does not halve the
+        range is followed by a plain bisection, which bounds the worst case
+        at twice binary search's. A typical lookup takes 3-5 probes rather
+        than log2(count).
+        """
+        size = self.record_size
+        key = int.from_bytes(digest[:size], 'big')
+        data = self._map
+        lo, hi = 0, self.count
+        # Every record in [lo, hi) lies in [lo_value, hi_value)
+        lo_value, hi_value = 0, 1 << (size * 8)
+        interpolate = True
+        while lo < hi:
+            if interpolate:
+                offset = (key - lo_value) * (hi - lo) // (hi_value - lo_value)
+                mid = min(max(lo + offset, lo), hi - 1)
+            else:
+                mid = (lo + hi) // 2
+            start = HEADER.size + mid * size
+            record = int.from_bytes(data[start:start + size], 'big')
+
+            width = hi - lo
+            if record < key:
+                lo, lo_value = mid + 1, record + 1
+            elif record > key:
+                hi, hi_value = mid, record
+            else:
+                return True
+            interpolate = not interpolate or (hi - lo) * 2 <= width
+        return False
+
+    def contains_password(self, password) -> bool:
+        return hashlib.sha1(password.encode()).digest() in self
+
+    def close(self):
+        self._map.close()
+
+
+def write_corpus(path, digests, record_size=DIGEST_SIZE) -> int:
+    """
+    Write sorted SHA-1 ``digests`` (bytes, ascending; duplicates allowed)
+    to ``path`` as a corpus, keeping ``record_size`` bytes of each. The file
+    is swapped in atomically, so processes that already mapped the old one
+    keep reading it until they reopen. Returns the number of records.
+    """
+    if not 0 < record_size <= DIGEST_SIZE:
+        raise ValueError(f'record_size must be 1..{DIGEST_SIZE}')
+
+    tmp_path = f'{path}.tmp'
+    count = 0
+    previous = b''
+    try:
+        with open(tmp_path, 'wb', buffering=1 << 20) as fh:
+            fh.write(HEADER.pack(MAGIC, VERSION, record_size))
+            for digest in digests:
+                record = digest[:record_size]
+                if record == previous:
+                    continue
+                if record < previous:
+                    raise ValueError('digests must be sorted')
+                fh.write(record)
+                previous = record
+                count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def parse_hash_line(line):
+    """
+    Return ``(digest, count)`` for a ``SHA1HEX`` or ``SHA1HEX:COUNT`` line
+    (the Have I Been Pwned download format), or None if it is not one.
+    """
+    hex_digest, _sep, count = line.strip().partition(':')
+    if len(hex_digest) != DIGEST_SIZE * 2:
+        return None
+    try:
+        return bytes.fromhex(hex_digest), int(count) if count else 1
+    except ValueError:
+        return None
+
+
+_corpora = {}
+_corpora_lock = threading.Lock()
+
+
+def get_breached_corpus(path) -> BreachedCorpus:
+    """
+    Return the process-wide corpus mapped from ``path``.
+    """
+    corpus = _corpora.get(path)
+    if corpus is None:
+        with _corpora_lock:
+            corpus = _corpora.get(path)
+            if corpus is None:
+                corpus = _corpora[path] = BreachedCorpus(path)
+    return corpus
@@ -0,0 +1,95 @@
+# apps/auth/services/generations.py
+
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.account.models import CustomUser
+from apps.account.services.user_cache import (
+    get_user_cache,
+    invalidate_user,
+)
+from apps.auth.models import DeviceSession
+
+# Tokens issued before the claim existed count as generation 0
+GENERATION_CLAIM = 'gen'
+
+
+def load_user(user_id):
+    """
+    Load the user with its profile joined, so /account/me needs no
+    follow-up query. The password hash is left out (and so never cached)
+    unless ``CHECK_REVOKE_TOKEN`` compares against it.
+
+    Always reads the primary, even on replica routes: a lagging replica
+    would miss new users and cache rows from before a logout.
+    """
+    users = CustomUser.objects.using('default').select_related('profile')
+    if not api_settings.CHECK_REVOKE_TOKEN:
+        users = users.defer('password')
+    return users.get(**{api_settings.USER_ID_FIELD: user_id})
+
+
+def cached_user(user_id):
+    return get_user_cache().get(user_id, load_user)
+
+
+def is_current_generation(payload, user) -> bool:
+    return payload.get(GENERATION_CLAIM, 0) >= user.token_generation
+
+
+def check_generation(payload, fresh=False):
+    """
+    Return the token's user (through the user cache, or from the database
+    if ``fresh``), raising ``TokenError`` if the user is gone or has logged
+    out everywhere since the token was issued.
+    """
+    load = load_user if fresh else cached_user
+    try:
+        user = load(payload[api_settings.USER_ID_CLAIM])
+    except (KeyError, CustomUser.DoesNotExist):
+        raise TokenError(_('User not found'))
+    if not is_current_generation(payload, user):
+        raise TokenError(_('Token has been revoked'))
+    return user
+
+
+def current_generations(user_ids) -> dict:
+    """
+    Return ``{str(user_id): token_generation}`` for the users that exist:
+    cached users first, then one query for the rest.
+    """
+    cache = get_user_cache()
+    generations = {}
+    missing = []
+    for user_id in {str(user_id) for user_id in user_ids}:
+        user = cache.peek(user_id)
+        if user is None:
+            missing.append(user_id)
+        else:
+            generations[user_id] = user.token_generation
+    if missing:
+        generations.update(
+            (str(pk), generation)
+            for pk, generation in CustomUser.objects.filter(
+                pk__in=missing
+            ).values_list('pk', 'token_generation')
+        )
+    return generations
+
+
+def revoke_all_tokens(users):
+    """
+    Invalidate every token issued so far to ``users`` (a queryset) with a
+    single UPDATE, however many tokens are outstanding, and drop their
+    device sessions.
+    """
+    pks = list(users.values_list('pk', flat=True))
+    CustomUser.objects.filter(pk__in=pks).update(
+        token_generation=F('token_generation') + 1
+    )
+    DeviceSession.objects.filter(user_id__in=pks).delete()
+    for pk in pks:
+        invalidate_user(pk)
+    return len(pks)
@@ -0,0 +1,59 @@
+# apps/auth/services/hashing.py
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+def init_hashing_worker():
+    # Spawned worker processes need the app registry for the hashers
+    if not apps.ready:
+        django.setup()
+
+
+_executor = None
+
+
+def get_hashing_executor():
+    """
+    Return the bounded pool that runs password hashing off the request
+    threads, configured by ``PASSWORD_HASHING``.
+    """
+    global _executor
+    if _executor is None:
+        conf = getattr(settings, 'PASSWORD_HASHING', {})
+        max_workers = conf.get('MAX_WORKERS', 2)
+        if conf.get('EXECUTOR', 'thread') == 'process':
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=init_hashing_worker
+            )
+        else:
+            # hashlib releases the GIL, so threads hash in parallel
+            _executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='password-hash'
+            )
+    return _executor
+
+
+async def amake_password(password):
+    """
+    Hash ``password`` on the hashing pool (``None`` → unusable password).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hashing_executor(), make_password, password
+    )
+
+
+async def averify_password(password, encoded):
+    """
+    Return ``(is_correct, must_update)`` computed on the hashing pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hashing_executor(), verify_password, password, encoded
+    )
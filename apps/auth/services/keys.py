@@ -0,0 +1,201 @@
+# apps/auth/services/keys.py
+
+import hashlib
+import json
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import (
+    TokenBackendError,
+    TokenBackendExpiredToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+
+class SigningKey:
+    """
+    A parsed key pair (or public key only, for retired keys) and its JWK.
+    """
+
+    def __init__(self, kid, private_key=None, public_key=None):
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = public_key or private_key.public_key()
+
+        if isinstance(self.public_key, rsa.RSAPublicKey):
+            self.algorithm = 'RS256'
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        elif isinstance(self.public_key, ed25519.Ed25519PublicKey):
+            self.algorithm = 'EdDSA'
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        elif isinstance(self.public_key, ec.EllipticCurvePublicKey):
+            self.algorithm = 'ES256'
+            jwk = ECAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            raise ImproperlyConfigured(f'Unsupported key type for {kid!r}')
+
+        self.jwk = {**jwk, 'kid': kid, 'alg': self.algorithm, 'use': 'sig'}
+
+    @classmethod
+    def from_pem(cls, kid, data):
+        if b'PRIVATE KEY' in data:
+            return cls(kid, private_key=serialization.load_pem_private_key(
+                data, password=None
+            ))
+        return cls(kid, public_key=serialization.load_pem_public_key(data))
+
+
+class KeyRing:
+    """
+    Every verification key currently accepted, plus the one used to sign.
+
+    Keys are parsed once per process. Rotation means adding a new key,
+    switching ``ACTIVE_KID`` to it and, once the old key's tokens have
+    expired, retiring the old key to public-only and then removing it.
+    """
+
+    def __init__(self, keys, active_kid=None):
+        self.keys = {key.kid: key for key in keys}
+        signing = sorted(kid for kid, key in self.keys.items()
+                         if key.private_key is not None)
+        if not signing:
+            raise ImproperlyConfigured('No private signing key configured')
+        active_kid = active_kid or signing[-1]
+        if active_kid not in signing:
+            raise ImproperlyConfigured(
+                f'No private key found for ACTIVE_KID {active_kid!r}'
+            )
+        self.active = self.keys[active_kid]
+
+        self.jwks = json.dumps(
+            {'keys': [self.keys[kid].jwk for kid in sorted(self.keys)]},
+            separators=(',', ':'),
+        ).encode()
+        self.etag = hashlib.sha256(self.jwks).hexdigest()[:32]
+
+    @classmethod
+    def from_directory(cls, path, active_kid=None):
+        """
+        Load every ``<kid>.pem`` file (private or public key) in ``path``.
+        """
+        keys = [
+            SigningKey.from_pem(pem.stem, pem.read_bytes())
+            for pem in sorted(Path(path).glob('*.pem'))
+        ]
+        return cls(keys, active_kid)
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    Signs with the key ring's active key (``kid`` header) and verifies
+    against whichever key the token's ``kid`` names.
+    """
+
+    def __init__(self, keyring, **kwargs):
+        super().__init__(keyring.active.algorithm, **kwargs)
+        self.keyring = keyring
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        key = self.keyring.active
+        return jwt.encode(
+            jwt_payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={'kid': key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError as ex:
+            raise TokenBackendError(_('Token is invalid')) from ex
+
+        key = self.keyring.get(kid)
+        if key is None:
+            raise TokenBackendError(_('Token is invalid'))
+
+        try:
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    'verify_aud': self.audience is not None,
+                    'verify_signature': verify,
+                },
+            )
+        except jwt.ExpiredSignatureError as ex:
+            raise TokenBackendExpiredToken(_('Token is expired')) from ex
+        except jwt.InvalidTokenError as ex:
+            raise TokenBackendError(_('Token is invalid')) from ex
+
+
+_keyring = None
+_token_backend = None
+
+
+def get_keyring():
+    """
+    Return the key ring configured by ``JWT_SIGNING_KEYS``, or None when
+    tokens are still signed with the symmetric ``SIMPLE_JWT`` key.
+    """
+    global _keyring
+    if _keyring is None:
+        conf = getattr(settings, 'JWT_SIGNING_KEYS', {})
+        if not conf.get('KEYS_DIR'):
+            return None
+        _keyring = KeyRing.from_directory(
+            conf['KEYS_DIR'], conf.get('ACTIVE_KID')
+        )
+    return _keyring
+
+
+def get_token_backend():
+    """
+    Return the token backend shared by every token class in apps.auth.
+    """
+    global _token_backend
+    if _token_backend is None:
+        keyring = get_keyring()
+        if keyring is None:
+            from rest_framework_simplejwt.state import token_backend
+            _token_backend = token_backend
+        else:
+            _token_backend = KeyRingTokenBackend(
+                keyring,
+                audience=api_settings.AUDIENCE,
+                issuer=api_settings.ISSUER,
+                leeway=api_settings.LEEWAY,
+                json_encoder=api_settings.JSON_ENCODER,
+            )
+    return _token_backend
+
+
+@receiver(setting_changed)
+def _reset_keyring(setting, **kwargs):
+    global _keyring, _token_backend
+    if setting in ('JWT_SIGNING_KEYS', 'SIMPLE_JWT'):
+        _keyring = None
+        _token_backend = None
@@ -0,0 +1,157 @@
+# apps/auth/services/last_login.py
+
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_finished, setting_changed
+from django.db import DatabaseError
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.account.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+# Four query parameters per user; stays under SQLite's 999
+FLUSH_BATCH = 200
+
+
+class LastLoginBuffer:
+    """
+    Write-behind ``last_login``: logins are recorded in memory and written
+    as one batched UPDATE at most every ``flush_interval`` seconds, and
+    at exit. Flushes happen when a request finishes, never inside a login;
+    reaching ``max_pending`` users only makes the next one due at once.
+    Logins that fail to be written are kept for the next flush.
+
+    A login is not recorded at all if the user's stored ``last_login`` is
+    less than ``precision`` seconds old.
+    """
+
+    def __init__(self, precision=300, flush_interval=10, max_pending=1000):
+        self.precision = timedelta(seconds=precision)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending = {}
+        self._flush_at = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, user, when=None) -> bool:
+        """
+        Note that ``user`` logged in at ``when`` (default now). Returns
+        False if the stored value was recent enough to keep.
+        """
+        when = when or timezone.now()
+        if user.last_login and when - user.last_login < self.precision:
+            return False
+
+        user.last_login = when
+        with self._lock:
+            if not self._pending:
+                self._flush_at = time.monotonic() + self.flush_interval
+            self._pending[user.pk] = when
+            if len(self._pending) >= self.max_pending:
+                self._flush_at = 0.0
+        return True
+
+    def flush_if_due(self):
+        if not self._pending or time.monotonic() < self._flush_at:
+            return
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Writing last_login failed; retrying later')
+            self._flush_at = time.monotonic() + self.flush_interval
+
+    def flush(self) -> int:
+        """
+        Write every pending login; return the number of users updated.
+        On a database error the logins not yet written are pending again.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        updated = 0
+        for start in range(0, len(items), FLUSH_BATCH):
+            try:
+                updated += self._write(items[start:start + FLUSH_BATCH])
+            except DatabaseError:
+                self._restore(items[start:])
+                raise
+        return updated
+
+    def _write(self, batch):
+        # Never move last_login backwards (other workers flush too)
+        return CustomUser.objects.filter(
+            pk__in=[pk for pk, _ in batch]
+        ).update(last_login=Case(
+            *(
+                When(
+                    Q(pk=pk) & (
+                        Q(last_login__isnull=True)
+                        | Q(last_login__lt=when)
+                    ),
+                    then=Value(when),
+                )
+                for pk, when in batch
+            ),
+            default=F('last_login'),
+            output_field=DateTimeField(),
+        ))
+
+    def _restore(self, items):
+        with self._lock:
+            for pk, when in items:
+                if pk not in self._pending or self._pending[pk] < when:
+                    self._pending[pk] = when
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+_buffer = None
+
+
+def get_last_login_buffer() -> LastLoginBuffer:
+    """
+    Return the process-wide buffer configured by ``LAST_LOGIN``.
+    """
+    global _buffer
+    if _buffer is None:
+        conf = getattr(settings, 'LAST_LOGIN', {})
+        _buffer = LastLoginBuffer(
+            precision=conf.get('PRECISION', 300),
+            flush_interval=conf.get('FLUSH_INTERVAL', 10),
+            max_pending=conf.get('MAX_PENDING', 1000),
+        )
+    return _buffer
+
+
+@receiver(request_finished)
+def _flush_when_due(sender, **kwargs):
+    if _buffer is not None:
+        _buffer.flush_if_due()
+
+
+@atexit.register
+def _flush_at_exit():
+    if _buffer is None or not _buffer.pending():
+        return
+    try:
+        _buffer.flush()
+    except DatabaseError:
+        # The database is already gone (e.g. test databases destroyed)
+        pass
+
+
+@receiver(setting_changed)
+def _reset_buffer(setting, **kwargs):
+    global _buffer
+    if setting == 'LAST_LOGIN':
+        _buffer = None
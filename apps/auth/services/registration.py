@@ -0,0 +1,160 @@
+# apps/auth/services/registration.py
+
+import hmac
+import json
+import secrets
+import sys
+import threading
+
+from django.conf import settings
+from django.core import signing
+from django.core.mail import send_mail
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import salted_hmac
+from django.utils.module_loading import import_string
+
+PAYLOAD_SALT = 'apps.auth.registration.payload'
+OTP_SALT = 'apps.auth.registration.otp'
+
+
+class InvalidRegistration(Exception):
+    pass
+
+
+def get_registration_settings():
+    conf = {
+        'OTP_TTL': 600,
+        'OTP_DIGITS': 6,
+        'OTP_SENDER': 'apps.auth.services.registration.ConsoleOTPSender',
+        'OTP_SENDER_OPTIONS': {},
+    }
+    conf.update(getattr(settings, 'REGISTRATION', {}))
+    return conf
+
+
+def otp_digest(otp, email, nonce) -> str:
+    # Keyed, so the 10^6 possible codes cannot be tried against a payload
+    # offline
+    return salted_hmac(
+        OTP_SALT, f'{otp}:{email.lower()}:{nonce}', algorithm='sha256'
+    ).hexdigest()
+
+
+def issue_registration(email, password_hash=None):
+    """
+    Return ``(payload, otp)``: a signed, time-limited registration payload
+    that carries only a keyed hash of the one-time code. Nothing is stored.
+    """
+    digits = get_registration_settings()['OTP_DIGITS']
+    otp = f'{secrets.randbelow(10 ** digits):0{digits}d}'
+    nonce = secrets.token_urlsafe(8)
+    payload = signing.dumps(
+        {
+            'email': email,
+            'password': password_hash,
+            'nonce': nonce,
+            'otp': otp_digest(otp, email, nonce),
+        },
+        salt=PAYLOAD_SALT,
+        compress=True,
+    )
+    return payload, otp
+
+
+def verify_registration(payload, email, otp):
+    """
+    Return the registration claims in ``payload`` if it is authentic,
+    unexpired, for ``email`` and ``otp`` matches; otherwise raise
+    ``InvalidRegistration``. Touches no database.
+    """
+    try:
+        claims = signing.loads(
+            payload,
+            salt=PAYLOAD_SALT,
+            max_age=get_registration_settings()['OTP_TTL'],
+        )
+    except signing.SignatureExpired:
+        raise InvalidRegistration('Verification code has expired.')
+    except signing.BadSignature:
+        raise InvalidRegistration('Invalid registration payload.')
+
+    expected = otp_digest(otp, claims['email'], claims['nonce'])
+    if (
+        claims['email'].lower() != email.lower()
+        or not hmac.compare_digest(expected, claims['otp'])
+    ):
+        raise InvalidRegistration('Invalid verification code.')
+    return claims
+
+
+class ConsoleOTPSender:
+    """
+    Development stand-in: prints the code to stdout.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, email, otp):
+        self.stream.write(f'Verification code for {email}: {otp}\n')
+        self.stream.flush()
+
+
+class FileOTPSender:
+    """
+    Development/test stand-in: appends ``{"email", "otp"}`` lines to a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, email, otp):
+        line = json.dumps({'email': email, 'otp': otp}) + '\n'
+        with self._lock, open(self.path, 'a') as fh:
+            fh.write(line)
+
+
+class EmailOTPSender:
+    """
+    Sends the code through Django's configured email backend.
+    """
+
+    def __init__(
+        self, subject='Your verification code', from_email=None
+    ):
+        self.subject = subject
+        self.from_email = from_email
+
+    def send(self, email, otp):
+        ttl = get_registration_settings()['OTP_TTL'] // 60
+        send_mail(
+            self.subject,
+            f'Your verification code is {otp}. It expires in {ttl} minutes.',
+            self.from_email,
+            [email],
+        )
+
+
+_sender = None
+
+
+def get_otp_sender():
+    """
+    Return the sender configured by ``REGISTRATION['OTP_SENDER']``.
+    """
+    global _sender
+    if _sender is None:
+        conf = get_registration_settings()
+        _sender = import_string(conf['OTP_SENDER'])(
+            **conf['OTP_SENDER_OPTIONS']
+        )
+    return _sender
+
+
+@receiver(setting_changed)
+def _reset_sender(setting, **kwargs):
+    global _sender
+    if setting == 'REGISTRATION':
+        _sender = None
@@ -0,0 +1,303 @@
+# apps/auth/services/revocation.py
+
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, connections
+from django.db.models import Max
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on one blake2b).
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8,
+            math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(
+            bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+class RevocationIndex:
+    """
+    In-memory index of blacklisted JTIs in front of the token_blacklist
+    tables.
+
+    A miss in the Bloom filter means the token is definitely not revoked;
+    only possible hits fall back to the database. The filter is built on
+    first use, kept current in this process by the ``BlacklistedToken``
+    post_save signal, and synced from the table every ``SYNC_INTERVAL``
+    seconds to pick up tokens blacklisted by other workers. Periodic
+    rebuilds run outside the lock, so other threads keep answering (and
+    syncing) from the old filter until the new one is swapped in.
+    """
+
+    def __init__(
+        self,
+        capacity=1_000_000,
+        error_rate=0.001,
+        sync_interval=1.0,
+        sync_overlap=100,
+        rebuild_interval=3600,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        # Re-read this many rows below the high-water mark on each sync,
+        # so ids committed out of order are not skipped.
+        self.sync_overlap = sync_overlap
+        self.rebuild_interval = rebuild_interval
+
+        self._filter = None
+        self._high_water = 0
+        self._sync_at = 0.0
+        self._rebuild_at = 0.0
+        self._rebuilding = False
+        # JTIs added while a build is in flight, replayed into the new
+        # filter (a row added before its transaction commits may be missed
+        # by the catch-up sync)
+        self._added = None
+        # Guards the filter and the sync state; held only for short syncs
+        # and swaps, never for a full rebuild.
+        self._lock = threading.Lock()
+        # Serializes the first build, when there is no filter to fall
+        # back on.
+        self._build_lock = threading.Lock()
+
+        self.negatives = 0
+        self.db_checks = 0
+
+    def is_revoked(self, jti) -> bool:
+        """
+        Return True if the token with the given JTI is blacklisted.
+        """
+        if not self.might_be_revoked(jti):
+            self.negatives += 1
+            return False
+        self.db_checks += 1
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def revoked_among(self, jtis) -> set:
+        """
+        Return the blacklisted subset of ``jtis`` using at most one query.
+        """
+        candidates = [jti for jti in jtis if self.might_be_revoked(jti)]
+        self.negatives += len(jtis) - len(candidates)
+        if not candidates:
+            return set()
+        self.db_checks += 1
+        return set(
+            BlacklistedToken.objects
+            .filter(token__jti__in=candidates)
+            .values_list('token__jti', flat=True)
+        )
+
+    def might_be_revoked(self, jti) -> bool:
+        self._refresh()
+        return jti in self._filter
+
+    def peek(self, jti):
+        """
+        ``might_be_revoked`` without syncing; never queries. None if the
+        filter is not built yet or is due a sync.
+        """
+        bloom = self._filter
+        if bloom is None or time.monotonic() >= self._sync_at:
+            return None
+        return jti in bloom
+
+    def add(self, jti):
+        self._refresh()
+        with self._lock:
+            self._filter.add(jti)
+            if self._added is not None:
+                self._added.append(jti)
+
+    def refresh(self, ahead=0.0):
+        """
+        Build or sync the filter now if it is due within ``ahead`` seconds,
+        so a background task can keep ``peek`` answering.
+        """
+        self._refresh(time.monotonic() + ahead)
+
+    def rebuild(self):
+        """
+        Reload every non-expired blacklisted JTI from the database.
+        """
+        self._swap(*self._build())
+
+    def stats(self):
+        return {
+            'negatives': self.negatives,
+            'db_checks': self.db_checks,
+            'size': self._filter.count if self._filter else 0,
+        }
+
+    def _refresh(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._filter is not None and now < self._sync_at:
+            return
+
+        if self._filter is None:
+            with self._build_lock:
+                if self._filter is None:
+                    self._swap(*self._build())
+            return
+
+        if now >= self._rebuild_at and self._claim_rebuild():
+            try:
+                self._swap(*self._build())
+            finally:
+                self._rebuilding = False
+            return
+
+        with self._lock:
+            if now >= self._sync_at:
+                self._sync()
+
+    def _claim_rebuild(self) -> bool:
+        with self._lock:
+            if self._rebuilding:
+                return False
+            self._rebuilding = True
+            return True
+
+    def _build(self):
+        """
+        Return a new ``(filter, high_water)`` from the table; holds the
+        lock only to start recording ``add`` calls.
+        """
+        with self._lock:
+            if self._added is None:
+                self._added = []
+        try:
+            high_water = BlacklistedToken.objects.aggregate(
+                high_water=Max('id')
+            )['high_water'] or 0
+            jtis = (
+                BlacklistedToken.objects
+                .filter(
+                    id__lte=high_water, token__expires_at__gt=aware_utcnow()
+                )
+                .values_list('token__jti', flat=True)
+            )
+            count = jtis.count()
+            bloom = BloomFilter(
+                max(self.capacity, count * 2), self.error_rate
+            )
+            for jti in jtis.iterator(chunk_size=10000):
+                bloom.add(jti)
+        except BaseException:
+            with self._lock:
+                self._added = None
+            raise
+        return bloom, high_water
+
+    def _swap(self, bloom, high_water):
+        with self._lock:
+            for jti in self._added or ():
+                bloom.add(jti)
+            self._added = None
+            self._filter = bloom
+            self._high_water = high_water
+            self._rebuild_at = time.monotonic() + self.rebuild_interval
+            # Catch up on rows blacklisted while the filter was built
+            self._sync()
+
+    def _sync(self):
+        rows = (
+            BlacklistedToken.objects
+            .filter(id__gt=self._high_water - self.sync_overlap)
+            .order_by('id')
+            .values_list('id', 'token__jti')
+        )
+        for row_id, jti in rows:
+            if jti not in self._filter:
+                self._filter.add(jti)
+            self._high_water = max(self._high_water, row_id)
+
+        self._sync_at = time.monotonic() + self.sync_interval
+        # Grow (and drop expired tokens) once the filter is over capacity
+        if self._filter.count > self._filter.capacity:
+            self._rebuild_at = 0.0
+
+
+_revocation_index = None
+
+
+def get_revocation_index() -> RevocationIndex:
+    """
+    Return the process-wide revocation index configured by
+    ``REVOCATION_INDEX``.
+    """
+    global _revocation_index
+    if _revocation_index is None:
+        conf = getattr(settings, 'REVOCATION_INDEX', {})
+        _revocation_index = RevocationIndex(
+            capacity=conf.get('CAPACITY', 1_000_000),
+            error_rate=conf.get('ERROR_RATE', 0.001),
+            sync_interval=conf.get('SYNC_INTERVAL', 1.0),
+            sync_overlap=conf.get('SYNC_OVERLAP', 100),
+            rebuild_interval=conf.get('REBUILD_INTERVAL', 3600),
+        )
+    return _revocation_index
+
+
+def warm_revocation_index():
+    """
+    Build the index now (from wsgi.py/asgi.py), so the first request does
+    not pay for the table scan. A database that is not reachable yet only
+    leaves the build to the first request.
+    """
+    if (
+        'rest_framework_simplejwt.token_blacklist'
+        not in settings.INSTALLED_APPS
+    ):
+        return
+    try:
+        get_revocation_index().refresh()
+    except DatabaseError:
+        logger.warning('Revocation index not built at startup', exc_info=True)
+    finally:
+        # Not shared with forked workers (gunicorn --preload)
+        connections.close_all()
+
+
+@receiver(setting_changed)
+def _reset_revocation_index(setting, **kwargs):
+    global _revocation_index
+    if setting == 'REVOCATION_INDEX':
+        _revocation_index = None
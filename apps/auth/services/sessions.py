@@ -0,0 +1,65 @@
+# apps/auth/services/sessions.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+from apps.auth.models import DeviceSession
+from apps.auth.tokens import RefreshToken
+
+# Tokens issued before sessions existed have none, and are not tracked
+SESSION_CLAIM = 'sid'
+
+
+def start_session(user, request=None, token_class=None):
+    """
+    Issue a refresh token for ``user`` and record a device session for it;
+    returns ``(refresh, session)``. The session id is stamped into the
+    token (and so into the access tokens made from it) before the token is
+    added to the outstanding list.
+    """
+    token_class = token_class or RefreshToken
+    session = DeviceSession(user=user, last_used_at=aware_utcnow())
+    if request is not None:
+        session.device = request.META.get('HTTP_USER_AGENT', '')[:255]
+        session.ip_address = BaseThrottle().get_ident(request) or None
+    refresh = token_class.for_user(user, **{SESSION_CLAIM: str(session.pk)})
+    session.refresh_jti = refresh[api_settings.JTI_CLAIM]
+    session.expires_at = datetime_from_epoch(refresh['exp'])
+    session.save(force_insert=True)
+    return refresh, session
+
+
+def touch_session(refresh):
+    """
+    Move the token's session to ``refresh`` (after rotation: new jti and
+    expiry) in one UPDATE, raising ``TokenError`` if it has been revoked.
+    """
+    sid = refresh.get(SESSION_CLAIM)
+    if sid is None:
+        return
+    updated = DeviceSession.objects.filter(pk=sid).update(
+        refresh_jti=refresh[api_settings.JTI_CLAIM],
+        last_used_at=aware_utcnow(),
+        expires_at=datetime_from_epoch(refresh['exp']),
+    )
+    if not updated:
+        raise TokenError(_('Session has been revoked'))
+
+
+def revoke_session(session):
+    """
+    End a session. Its refresh token is blacklisted and can no longer be
+    refreshed; access tokens already issued from it run out within
+    ``ACCESS_TOKEN_LIFETIME``.
+    """
+    token = OutstandingToken.objects.filter(jti=session.refresh_jti).first()
+    if token is not None:
+        BlacklistedToken.objects.get_or_create(token=token)
+    session.delete()
@@ -0,0 +1,343 @@
+# apps/auth/services/verify_server.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.account.services.user_cache import get_user_cache
+from apps.auth.serializers import TokenVerifySerializer
+from apps.auth.services.generations import is_current_generation
+from apps.auth.services.revocation import get_revocation_index
+from apps.auth.tokens import UntypedToken
+from apps.core.utils import fastjson
+from apps.core.utils.database import replica_reads
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 8192
+MAX_BODY_BYTES = 16384
+# Seconds a keep-alive connection may sit idle between requests
+IDLE_TIMEOUT = 60
+
+USER_ID_HEADER = 'X-User-Id'
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    401: 'Unauthorized',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Content Too Large',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+def _invalid(error):
+    # Same body as InvalidToken from TokenVerifyView
+    return 401, {'detail': str(error.args[0]), 'code': 'token_not_valid'}
+
+
+def _blacklist_enabled():
+    return (
+        api_settings.BLACKLIST_AFTER_ROTATION
+        and 'rest_framework_simplejwt.token_blacklist'
+        in settings.INSTALLED_APPS
+    )
+
+
+def verify_in_memory(raw):
+    """
+    Verify ``raw`` from in-memory state only: the signature, the revocation
+    index and the user cache. Returns ``(status, data, user_id)``, or None
+    if the answer needs the database (a possible blacklist hit, a stale
+    index, or a user not cached yet).
+    """
+    if not isinstance(raw, str) or not raw:
+        return None
+    try:
+        token = UntypedToken(raw)
+    except TokenError as e:
+        return (*_invalid(e), None)
+
+    if _blacklist_enabled():
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti is None or get_revocation_index().peek(jti) is not False:
+            return None
+
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    user = get_user_cache().peek(user_id) if user_id is not None else None
+    if user is None:
+        return None
+    if not is_current_generation(token.payload, user):
+        return (*_invalid(TokenError(_('Token has been revoked'))), None)
+    return 200, {}, str(user_id)
+
+
+def verify(raw):
+    """
+    Verify ``raw`` exactly as ``POST /auth/token/verify/`` does; may query
+    the database. Returns ``(status, data, user_id)``.
+    """
+    serializer = TokenVerifySerializer(
+        data={} if raw is None else {'token': raw}
+    )
+    try:
+        valid = serializer.is_valid()
+    except TokenError as e:
+        return (*_invalid(e), None)
+    if not valid:
+        return 400, serializer.errors, None
+    user_id = UntypedToken(raw, verify=False).get(api_settings.USER_ID_CLAIM)
+    return 200, {}, str(user_id)
+
+
+def _verify_with_database(raw):
+    # Runs on an executor thread: treat each call like a request, so stale
+    # connections are dropped as the request cycle would.
+    close_old_connections()
+    try:
+        with replica_reads():
+            return verify(raw)
+    finally:
+        close_old_connections()
+
+
+def _refresh_revocation_index(ahead):
+    close_old_connections()
+    try:
+        get_revocation_index().refresh(ahead)
+    finally:
+        close_old_connections()
+
+
+class BadRequest(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class VerifyServer:
+    """
+    Minimal HTTP/1.1 token verification server on asyncio, for running
+    next to a gateway or another service (see ``runverifyserver``).
+
+    ``POST /verify`` with ``{"token": "..."}``, or ``GET /verify`` with an
+    ``Authorization: Bearer`` header, answers as ``/auth/token/verify/``
+    does; a valid token also gets its user id in ``X-User-Id``.
+    ``GET /health`` answers 200.
+
+    Tokens are checked on the event loop from memory (``verify_in_memory``)
+    without the Django request cycle. Anything that needs the database runs
+    the full check on a small thread pool, which also keeps the revocation
+    index synced in the background.
+    """
+
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='verify-db'
+        )
+        self.in_memory = 0
+        self.with_database = 0
+        self._refresher = None
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """
+        Listen on ``path`` (a Unix socket) or ``host:port``; returns the
+        ``asyncio.Server``.
+        """
+        if path:
+            server = await asyncio.start_unix_server(
+                self.handle, path=path, limit=MAX_HEADER_BYTES
+            )
+        else:
+            server = await asyncio.start_server(
+                self.handle, host, port, limit=MAX_HEADER_BYTES
+            )
+        if _blacklist_enabled():
+            self._refresher = asyncio.create_task(self.keep_index_synced())
+        return server
+
+    async def close(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def keep_index_synced(self):
+        interval = get_revocation_index().sync_interval
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = interval / 4
+            try:
+                # Sync ahead of expiry, so peek() rarely finds it stale
+                await loop.run_in_executor(
+                    self.executor, _refresh_revocation_index, interval / 2
+                )
+            except Exception:
+                logger.exception('Revocation index sync failed')
+                delay = max(interval, 5.0)
+            await asyncio.sleep(delay)
+
+    async def verify(self, raw):
+        verdict = verify_in_memory(raw)
+        if verdict is not None:
+            self.in_memory += 1
+            return verdict
+        self.with_database += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _verify_with_database, raw
+        )
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except BadRequest as e:
+                    writer.write(self.response(
+                        e.status, {'detail': e.detail}, keep_alive=False
+                    ))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, version, headers, body = request
+                keep_alive = self.keep_alive(version, headers)
+                try:
+                    status, data, user_id = await self.dispatch(
+                        method, path, headers, body
+                    )
+                except Exception:
+                    logger.exception('Token verification failed')
+                    status, data, user_id = (
+                        500, {'detail': 'A server error occurred.'}, None
+                    )
+                writer.write(self.response(status, data, user_id, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """
+        Return ``(method, path, version, headers, body)``, or None at end
+        of stream.
+        """
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            return None
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise BadRequest(400, 'Incomplete request.')
+            return None
+        except asyncio.LimitOverrunError:
+            raise BadRequest(431, 'Request headers too large.')
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise BadRequest(400, 'Malformed request line.')
+        if not version.startswith('HTTP/1.'):
+            raise BadRequest(400, 'Unsupported HTTP version.')
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(':')
+            if not sep:
+                raise BadRequest(400, 'Malformed header.')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            raise BadRequest(400, 'Chunked bodies are not supported.')
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise BadRequest(400, 'Invalid Content-Length.')
+        if length < 0:
+            raise BadRequest(400, 'Invalid Content-Length.')
+        if length > MAX_BODY_BYTES:
+            raise BadRequest(413, 'Request body too large.')
+        try:
+            body = await reader.readexactly(length) if length else b''
+        except asyncio.IncompleteReadError:
+            raise BadRequest(400, 'Incomplete request.')
+
+        return method, target.partition('?')[0], version, headers, body
+
+    def keep_alive(self, version, headers):
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def dispatch(self, method, path, headers, body):
+        if path == '/health':
+            if method != 'GET':
+                return self.not_allowed(method)
+            return 200, {'status': 'ok'}, None
+
+        if path != '/verify':
+            return 404, {'detail': 'Not found.'}, None
+
+        if method == 'POST':
+            try:
+                data = fastjson.loads(body) if body else {}
+            except ValueError as e:
+                return 400, {'detail': f'JSON parse error - {e}'}, None
+            if not isinstance(data, dict):
+                return 400, {'detail': 'Expected a JSON object.'}, None
+            return await self.verify(data.get('token'))
+
+        if method == 'GET':
+            raw = self.bearer_token(headers)
+            if raw is None:
+                return 401, {
+                    'detail': 'Authentication credentials were not provided.',
+                    'code': 'not_authenticated',
+                }, None
+            return await self.verify(raw)
+
+        return self.not_allowed(method)
+
+    def not_allowed(self, method):
+        return 405, {'detail': f'Method "{method}" not allowed.'}, None
+
+    def bearer_token(self, headers):
+        parts = headers.get('authorization', '').split()
+        if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+            return None
+        return parts[1]
+
+    def response(self, status, data, user_id=None, keep_alive=True):
+        body = fastjson.dumps(data).encode()
+        lines = [
+            f'HTTP/1.1 {status} {REASONS[status]}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        if user_id is not None:
+            lines.append(f'{USER_ID_HEADER}: {user_id}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
@@ -0,0 +1,13 @@
+# apps/auth/signals.py
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.auth.services.revocation import get_revocation_index
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def index_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        get_revocation_index().add(instance.token.jti)
@@ -1,3 +1,1082 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from uuid import uuid4
 
-# Create your tests here.
+import jwt
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.password_validation import validate_password
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import (
+    AsyncRequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.account.models import CustomUser
+from apps.account.services.user_cache import UserCache, get_user_cache
+from apps.auth.checks import check_breached_corpus
+from apps.auth.models import DeviceSession
+from apps.auth.services.breached import (
+    BreachedCorpus,
+    InvalidCorpus,
+    write_corpus,
+)
+from apps.auth.services.generations import cached_user, revoke_all_tokens
+from apps.auth.services.last_login import (
+    LastLoginBuffer,
+    get_last_login_buffer,
+)
+from apps.auth.services.revocation import (
+    BloomFilter,
+    get_revocation_index,
+)
+from apps.auth.services.sessions import SESSION_CLAIM, start_session
+from apps.auth.services.verify_server import (
+    MAX_BODY_BYTES,
+    VerifyServer,
+    verify,
+    verify_in_memory,
+)
+from apps.auth.tokens import AccessToken, RefreshToken
+from apps.auth.views.registration import registration_start_async
+from apps.auth.views.token import token_obtain_pair
+from apps.core.utils.debounce import reset_rate_limits
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = CustomUser.objects.create_user(
+            'user@example.com', 'S3cure-pass!'
+        )
+        self.auth = {
+            'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'
+        }
+
+    def test_second_request_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/account/me', **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/account/me', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'user@example.com')
+
+        stats = get_user_cache().stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get('/account/me', **self.auth)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get('/account/me', **self.auth)
+        self.assertEqual(response.status_code, 401)
+
+    def test_profile_change_invalidates_cache(self):
+        self.client.get('/account/me', **self.auth)
+
+        self.user.profile.phone = '+1234555678'
+        self.user.profile.save()
+
+        response = self.client.get('/account/me', **self.auth)
+        self.assertEqual(response.json()['profile']['phone'], '+1234555678')
+
+    def test_invalidates_again_on_commit(self):
+        cache = get_user_cache()
+        stale = CustomUser.objects.get(pk=self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # A request racing the transaction re-caches the committed row
+            cache.get(self.user.pk, lambda user_id: stale)
+            self.assertIsNotNone(cache.peek(self.user.pk))
+        self.assertIsNone(cache.peek(self.user.pk))
+
+    def test_racing_load_does_not_reach_the_shared_tier(self):
+        cache = UserCache(shared_cache='default')
+        other = UserCache(shared_cache='default')
+        fresh = CustomUser.objects.get(pk=self.user.pk)
+        stale = CustomUser.objects.get(pk=self.user.pk)
+        stale.is_active = False
+
+        def racing_loader(user_id):
+            cache.invalidate(user_id)  # the row changed mid-load
+            return stale
+
+        cache.get(self.user.pk, racing_loader)
+        user = other.get(self.user.pk, lambda user_id: fresh)
+        self.assertTrue(user.is_active)
+        self.assertEqual(other.stats()['misses'], 1)
+        self.assertEqual(
+            cache.get(self.user.pk, lambda user_id: fresh).pk, self.user.pk
+        )
+        self.assertEqual(cache.stats()['shared_hits'], 1)
+
+
+class RegistrationTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        self.outbox = os.path.join(tmpdir, 'otp.jsonl')
+        self.enterContext(override_settings(REGISTRATION={
+            'OTP_SENDER': 'apps.auth.services.registration.FileOTPSender',
+            'OTP_SENDER_OPTIONS': {'path': self.outbox},
+        }))
+
+    def start(self, email, password=''):
+        response = self.client.post('/auth/registration/start', {
+            'email': email,
+            'password': password,
+            'confirm_password': password,
+        })
+        self.assertEqual(response.status_code, 202)
+        return response.json()['payload']
+
+    def last_otp(self):
+        with open(self.outbox) as fh:
+            return json.loads(fh.readlines()[-1])['otp']
+
+    def confirm(self, email, payload, otp=None):
+        return self.client.post('/auth/registration/confirm', {
+            'email': email, 'payload': payload, 'otp': otp or self.last_otp(),
+        })
+
+    def register(self, email, password=''):
+        return self.confirm(email, self.start(email, password))
+
+    def test_start_writes_nothing(self):
+        with self.assertNumQueries(0):
+            self.start('new@example.com', 'S3cure-pass!')
+        self.assertFalse(CustomUser.objects.exists())
+
+    def test_confirm_creates_user_with_start_password(self):
+        payload = self.start('new@example.com', 'S3cure-pass!')
+
+        with self.assertNumQueries(4) as ctx:  # + SAVEPOINT / RELEASE
+            response = self.confirm('New@example.com', payload)
+        self.assertEqual(response.status_code, 201)
+
+        statements = [q['sql'].split()[0] for q in ctx.captured_queries]
+        self.assertEqual(statements.count('INSERT'), 2)
+        self.assertNotIn('SELECT', statements)
+        user = CustomUser.objects.get(pk=response.json()['id'])
+        self.assertTrue(user.check_password('S3cure-pass!'))
+
+    def test_bad_code_or_payload_is_rejected_without_queries(self):
+        payload = self.start('new@example.com')
+        otp = self.last_otp()
+        wrong = f'{(int(otp) + 1) % 10 ** len(otp):0{len(otp)}d}'
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.confirm('new@example.com', payload, wrong).status_code,
+                400
+            )
+            self.assertEqual(
+                self.confirm('other@example.com', payload, otp).status_code,
+                400
+            )
+            self.assertEqual(
+                self.confirm('new@example.com', payload + 'x', otp)
+                .status_code, 400
+            )
+
+    def test_expired_payload_is_rejected(self):
+        payload = self.start('new@example.com')
+        with self.settings(REGISTRATION={'OTP_TTL': -1}):
+            response = self.confirm('new@example.com', payload)
+        self.assertEqual(response.status_code, 400)
+
+    def test_email_is_unique_case_insensitively(self):
+        self.assertEqual(self.register('new@example.com').status_code, 201)
+
+        response = self.register('NEW@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+        self.assertEqual(CustomUser.objects.count(), 1)
+
+    def test_login_ignores_email_case(self):
+        CustomUser.objects.create_user('User@Example.com', 'S3cure-pass!')
+
+        response = self.client.post('/auth/token/', {
+            'email': 'user@EXAMPLE.com', 'password': 'S3cure-pass!'
+        })
+        self.assertEqual(response.status_code, 200)
+
+
+class RevocationIndexTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            'user@example.com', 'S3cure-pass!'
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        get_revocation_index().rebuild()
+        # The generation check's user lookup is cached after first use
+        get_user_cache().clear()
+        cached_user(self.user.pk)
+
+    def test_verify_skips_database_for_unrevoked_token(self):
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                '/auth/token/verify/', {'token': str(self.refresh)}
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_verify_rejects_blacklisted_token(self):
+        self.refresh.blacklist()
+
+        response = self.client.post(
+            '/auth/token/verify/', {'token': str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_periodic_rebuild_does_not_hold_the_lock(self):
+        index = get_revocation_index()
+        old = index._filter
+        build = index._build
+        seen = []
+
+        def slow_build():
+            # Another thread can take the lock and still sees the old filter
+            seen.append(index._lock.acquire(blocking=False))
+            index._lock.release()
+            seen.append(index._filter is old)
+            result = build()
+            self.refresh.blacklist()  # missed by the new filter's query
+            return result
+
+        index._sync_at = index._rebuild_at = 0.0
+        with mock.patch.object(index, '_build', slow_build):
+            index.refresh()
+        self.assertEqual(seen, [True, True])
+        self.assertIsNot(index._filter, old)
+        self.assertTrue(index.might_be_revoked(self.refresh['jti']))
+
+    def test_jti_added_during_rebuild_survives_the_swap(self):
+        index = get_revocation_index()
+        build = index._build
+
+        def build_then_add():
+            result = build()
+            # Lands in the old filter while the new one is being built
+            index.add('late-jti')
+            return result
+
+        with mock.patch.object(index, '_build', build_then_add):
+            index.rebuild()
+        self.assertTrue(index.might_be_revoked('late-jti'))
+
+    def test_blacklist_missed_by_stale_index_still_fails_rotation(self):
+        # Simulate a token blacklisted by another worker before our sync
+        self.refresh.blacklist()
+        index = get_revocation_index()
+        index._filter = BloomFilter(10, 0.001)
+        index._sync_at = index._rebuild_at = float('inf')
+        self.addCleanup(index.rebuild)
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class TokenVerifyBatchTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            'user@example.com', 'S3cure-pass!'
+        )
+        get_revocation_index().rebuild()
+        get_user_cache().clear()
+        cached_user(self.user.pk)
+
+    def post(self, tokens):
+        return self.client.post(
+            '/auth/token/verify/batch', {'tokens': tokens},
+            content_type='application/json'
+        )
+
+    def test_reports_each_token(self):
+        revoked = RefreshToken.for_user(self.user)
+        revoked.blacklist()
+        tokens = [
+            str(AccessToken.for_user(self.user)),
+            str(revoked),
+            'not-a-token',
+            str(RefreshToken.for_user(self.user)),
+        ]
+
+        # The revoked token is the only candidate: a single IN query
+        with self.assertNumQueries(1):
+            response = self.post(tokens)
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(
+            [r['valid'] for r in results], [True, False, False, True]
+        )
+        self.assertEqual(results[0]['claims']['user_id'], str(self.user.pk))
+        self.assertEqual(results[1]['error'], 'Token is blacklisted')
+
+    def test_reports_tokens_revoked_by_logout_all(self):
+        old = str(AccessToken.for_user(self.user))
+        revoke_all_tokens(CustomUser.objects.filter(pk=self.user.pk))
+        self.user.refresh_from_db()
+        new = str(AccessToken.for_user(self.user))
+
+        results = self.post([old, new]).json()['results']
+        self.assertEqual(results[0]['error'], 'Token has been revoked')
+        self.assertTrue(results[1]['valid'])
+
+    def test_unrevoked_batch_skips_database(self):
+        tokens = [str(AccessToken.for_user(self.user)) for _ in range(5)]
+        with self.assertNumQueries(0):
+            response = self.post(tokens)
+        self.assertTrue(all(r['valid'] for r in response.json()['results']))
+
+    @override_settings(TOKEN_VERIFY_BATCH_MAX=2)
+    def test_rejects_oversized_batch(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(self.post([token] * 3).status_code, 400)
+        self.assertEqual(self.post([token] * 2).status_code, 200)
+        self.assertEqual(self.post([]).status_code, 400)
+
+
+class PurgeExpiredTokensTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user@example.com')
+        now = aware_utcnow()
+        self.expired = [
+            OutstandingToken.objects.create(
+                user=self.user, jti=uuid4().hex, token='',
+                expires_at=now - timedelta(days=1)
+            )
+            for _ in range(5)
+        ]
+        self.live = OutstandingToken.objects.create(
+            user=self.user, jti=uuid4().hex, token='',
+            expires_at=now + timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(token=self.expired[0])
+        BlacklistedToken.objects.create(token=self.live)
+
+    def test_purges_expired_tokens_in_batches(self):
+        out = StringIO()
+        call_command('purgeexpiredtokens', batch_size=2, stdout=out)
+
+        self.assertEqual(
+            list(OutstandingToken.objects.all()), [self.live]
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertEqual(out.getvalue().count('last_id='), 3)
+
+    def test_purges_expired_sessions(self):
+        now = aware_utcnow()
+        for days in (-2, -1, 1):
+            DeviceSession.objects.create(
+                user=self.user, refresh_jti=uuid4().hex, last_used_at=now,
+                expires_at=now + timedelta(days=days),
+            )
+        call_command('purgeexpiredtokens', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(
+            list(DeviceSession.objects.values_list('expires_at', flat=True)),
+            [now + timedelta(days=1)],
+        )
+
+    def test_resume_after_skips_processed_ids(self):
+        call_command(
+            'purgeexpiredtokens',
+            resume_after=self.expired[2].id,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            OutstandingToken.objects.filter(
+                expires_at__lte=aware_utcnow()
+            ).count(),
+            3
+        )
+
+
+class AsymmetricSigningTests(TestCase):
+    def setUp(self):
+        keys_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(keys_dir.cleanup)
+        self.keys_dir = keys_dir.name
+        for kid, algorithm in (('k1', 'RS256'), ('k2', 'EdDSA')):
+            call_command(
+                'generatesigningkey', dir=self.keys_dir, kid=kid,
+                algorithm=algorithm, stdout=StringIO()
+            )
+        self.user = CustomUser.objects.create_user('user@example.com')
+
+    def keys(self, active_kid):
+        return override_settings(JWT_SIGNING_KEYS={
+            'KEYS_DIR': self.keys_dir, 'ACTIVE_KID': active_kid,
+        })
+
+    def test_tokens_carry_kid_and_verify_after_rotation(self):
+        with self.keys('k1'):
+            old = str(AccessToken.for_user(self.user))
+        self.assertEqual(jwt.get_unverified_header(old)['kid'], 'k1')
+
+        with self.keys('k2'):
+            new = str(AccessToken.for_user(self.user))
+            self.assertEqual(jwt.get_unverified_header(new)['alg'], 'EdDSA')
+            for token in (old, new):
+                response = self.client.post(
+                    '/auth/token/verify/', {'token': token}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_retired_key_verifies_but_unknown_kid_fails(self):
+        with self.keys('k1'):
+            token = str(AccessToken.for_user(self.user))
+        call_command(
+            'generatesigningkey', dir=self.keys_dir, retire='k1',
+            stdout=StringIO()
+        )
+
+        with self.keys('k2'):
+            response = self.client.post(
+                '/auth/token/verify/', {'token': token}
+            )
+            self.assertEqual(response.status_code, 200)
+
+        os.remove(os.path.join(self.keys_dir, 'k1.pem'))
+        with self.keys('k2'):
+            response = self.client.post(
+                '/auth/token/verify/', {'token': token}
+            )
+            self.assertEqual(response.status_code, 401)
+
+    def test_jwks_lists_public_keys_with_etag(self):
+        with self.keys('k2'):
+            response = self.client.get('/.well-known/jwks.json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [key['kid'] for key in response.json()['keys']], ['k1', 'k2']
+            )
+            self.assertIn('max-age=300', response['Cache-Control'])
+            self.assertNotIn('d', response.json()['keys'][0])
+
+            response = self.client.get(
+                '/.well-known/jwks.json',
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+            self.assertEqual(response.status_code, 304)
+
+
+class AsyncAuthViewTests(TestCase):
+    factory = AsyncRequestFactory()
+
+    def setUp(self):
+        reset_rate_limits()
+        tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(REGISTRATION={
+            'OTP_SENDER': 'apps.auth.services.registration.FileOTPSender',
+            'OTP_SENDER_OPTIONS': {
+                'path': os.path.join(tmpdir, 'otp.jsonl'),
+            },
+        }))
+
+    def post(self, view, data):
+        request = self.factory.post(
+            '/', data=data, content_type='application/json'
+        )
+        return view(request)
+
+    async def test_token_obtain_pair(self):
+        await sync_to_async(CustomUser.objects.create_user)(
+            'user@example.com', 'S3cure-pass!'
+        )
+
+        response = await self.post(token_obtain_pair, {
+            'email': 'user@example.com', 'password': 'S3cure-pass!'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(json.loads(response.content)), {'access', 'refresh'}
+        )
+
+        response = await self.post(token_obtain_pair, {
+            'email': 'user@example.com', 'password': 'wrong'
+        })
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.post(token_obtain_pair, {
+            'email': 'nobody@example.com', 'password': 'wrong'
+        })
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.post(token_obtain_pair, {
+            'email': ['user@example.com'], 'password': 'S3cure-pass!'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            json.loads(response.content), {'email': ['Not a valid string.']}
+        )
+
+    async def test_registration_start(self):
+        response = await self.post(registration_start_async, {
+            'email': 'new@example.com',
+            'password': 'S3cure-pass!',
+            'confirm_password': 'S3cure-pass!',
+        })
+        self.assertEqual(response.status_code, 202)
+
+        claims = signing.loads(
+            json.loads(response.content)['payload'],
+            salt='apps.auth.registration.payload',
+        )
+        self.assertTrue(check_password('S3cure-pass!', claims['password']))
+        self.assertFalse(await CustomUser.objects.aexists())
+
+        response = await self.post(registration_start_async, {
+            'email': 'new@example.com', 'password': 'a',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class LastLoginBufferTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        self.users = [
+            CustomUser.objects.create_user(
+                f'user{i}@example.com', 'S3cure-pass!'
+            )
+            for i in range(3)
+        ]
+
+    def test_logins_are_written_in_one_batch(self):
+        buffer = LastLoginBuffer(precision=300, flush_interval=60)
+        for user in self.users:
+            self.assertTrue(buffer.record(user))
+        self.assertFalse(
+            CustomUser.objects.filter(last_login__isnull=False).exists()
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(
+            CustomUser.objects.filter(last_login__isnull=False).count(), 3
+        )
+
+    def test_recent_last_login_is_not_rewritten(self):
+        buffer = LastLoginBuffer(precision=300)
+        user = self.users[0]
+        user.last_login = aware_utcnow() - timedelta(minutes=1)
+
+        self.assertFalse(buffer.record(user))
+        self.assertEqual(buffer.pending(), 0)
+        self.assertTrue(
+            buffer.record(user, when=user.last_login + timedelta(minutes=5))
+        )
+
+    def test_flush_never_moves_last_login_backwards(self):
+        buffer = LastLoginBuffer()
+        user = self.users[0]
+        newer = aware_utcnow()
+        CustomUser.objects.filter(pk=user.pk).update(last_login=newer)
+
+        buffer.record(user, when=newer - timedelta(hours=1))
+        buffer.flush()
+        user.refresh_from_db()
+        self.assertEqual(user.last_login, newer)
+
+    def test_max_pending_defers_the_flush_to_request_end(self):
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=2)
+        with self.assertNumQueries(0):
+            for user in self.users[:2]:
+                buffer.record(user)
+
+        with self.assertNumQueries(1):
+            buffer.flush_if_due()
+        self.assertEqual(buffer.pending(), 0)
+
+    def test_failed_flush_keeps_pending_logins(self):
+        buffer = LastLoginBuffer(flush_interval=0)
+        for user in self.users:
+            buffer.record(user)
+
+        with mock.patch.object(
+            LastLoginBuffer, '_write', side_effect=DatabaseError
+        ), self.assertLogs('apps.auth.services.last_login', 'ERROR'):
+            buffer.flush_if_due()  # logged, not raised
+        self.assertEqual(buffer.pending(), 3)
+
+        self.assertEqual(buffer.flush(), 3)
+
+    @override_settings(LAST_LOGIN={'FLUSH_INTERVAL': 0})
+    def test_token_obtain_records_login_behind(self):
+        login = {'email': 'user0@example.com', 'password': 'S3cure-pass!'}
+        response = self.client.post('/auth/token/', login)
+        self.assertEqual(response.status_code, 200)
+
+        # Flushed once the request finished, since the interval is 0
+        self.assertEqual(get_last_login_buffer().pending(), 0)
+        self.users[0].refresh_from_db()
+        self.assertIsNotNone(self.users[0].last_login)
+
+
+class LogoutAllTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        get_user_cache().clear()
+        self.user = CustomUser.objects.create_user(
+            'user@example.com', 'S3cure-pass!'
+        )
+        self.sessions = [
+            RefreshToken.for_user(self.user) for _ in range(3)
+        ]
+
+    def test_revokes_every_outstanding_token_at_once(self):
+        access = self.sessions[0].access_token
+        response = self.client.post(
+            '/auth/logout/all', headers={'Authorization': f'Bearer {access}'}
+        )
+        self.assertEqual(response.status_code, 204)
+
+        for refresh in self.sessions:
+            response = self.client.post(
+                '/auth/token/refresh/', {'refresh': str(refresh)}
+            )
+            self.assertEqual(response.status_code, 401)
+        response = self.client.post(
+            '/auth/token/verify/', {'token': str(access)}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(
+            '/account/me', headers={'Authorization': f'Bearer {access}'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+        # A fresh login carries the new generation
+        response = self.client.post(
+            '/auth/token/',
+            {'email': 'user@example.com', 'password': 'S3cure-pass!'}
+        )
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': response.json()['refresh']}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_cost_does_not_grow_with_sessions(self):
+        self.sessions += [
+            start_session(self.user)[0] for _ in range(20)
+        ]
+        with self.assertNumQueries(3):
+            revoke_all_tokens(CustomUser.objects.filter(pk=self.user.pk))
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertFalse(DeviceSession.objects.exists())
+
+    def test_refresh_does_not_trust_the_user_cache(self):
+        refresh = self.sessions[0]
+        cached_user(self.user.pk)
+        # Another worker's change: this worker's cache is not invalidated
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': str(refresh)}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class LogoutAllReplicaLagTests(TestCase):
+    # replica_1 is a separate test database here, not a mirror
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        reset_rate_limits()
+        get_user_cache().clear()
+        self.addCleanup(get_user_cache().clear)
+        self.user = CustomUser.objects.create_user('user@example.com')
+        self.refresh = RefreshToken.for_user(self.user)
+        # The replica has not seen the logout below yet
+        CustomUser.objects.using('replica_1').bulk_create([
+            CustomUser(pk=self.user.pk, email='user@example.com')
+        ])
+        revoke_all_tokens(CustomUser.objects.filter(pk=self.user.pk))
+
+    def test_lagging_replica_does_not_revive_revoked_tokens(self):
+        response = self.client.post(
+            '/auth/token/verify/', {'token': str(self.refresh.access_token)}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            get_user_cache().peek(self.user.pk).token_generation, 1
+        )
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class DeviceSessionTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        get_user_cache().clear()
+        self.user = CustomUser.objects.create_user(
+            'user@example.com', 'S3cure-pass!'
+        )
+        self.other = CustomUser.objects.create_user(
+            'other@example.com', 'S3cure-pass!'
+        )
+
+    def login(self, email='user@example.com', device='Phone'):
+        response = self.client.post(
+            '/auth/token/',
+            {'email': email, 'password': 'S3cure-pass!'},
+            headers={'User-Agent': device},
+        )
+        return response.json()
+
+    def bearer(self, tokens):
+        return {'Authorization': f'Bearer {tokens["access"]}'}
+
+    def test_login_starts_a_session_that_rotation_updates_in_place(self):
+        tokens = self.login()
+        session = DeviceSession.objects.get()
+        self.assertEqual(session.device, 'Phone')
+        self.assertEqual(session.ip_address, '127.0.0.1')
+        refresh = RefreshToken(tokens['refresh'])
+        self.assertEqual(refresh[SESSION_CLAIM], str(session.pk))
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 200)
+        rotated = RefreshToken(response.json()['refresh'])
+        self.assertEqual(rotated[SESSION_CLAIM], str(session.pk))
+
+        session.refresh_from_db()
+        self.assertEqual(DeviceSession.objects.count(), 1)
+        self.assertEqual(session.refresh_jti, rotated['jti'])
+
+    def test_outstanding_token_is_stored_with_its_session(self):
+        refresh, session = start_session(self.user)
+        stored = OutstandingToken.objects.get(jti=refresh['jti'])
+        self.assertEqual(stored.token, str(refresh))
+        self.assertEqual(
+            RefreshToken(stored.token)[SESSION_CLAIM], str(session.pk)
+        )
+
+    def test_lists_own_active_sessions_in_pages(self):
+        tokens = [self.login(device=f'Device {i}') for i in range(3)]
+        self.login('other@example.com')
+        DeviceSession.objects.filter(device='Device 0').update(
+            expires_at=aware_utcnow() - timedelta(seconds=1)
+        )
+
+        response = self.client.get(
+            '/auth/sessions', {'page_size': 1}, headers=self.bearer(tokens[2])
+        )
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(
+            [(s['device'], s['current']) for s in page['results']],
+            [('Device 2', True)],
+        )
+
+        response = self.client.get(
+            page['next'], headers=self.bearer(tokens[2])
+        )
+        page = response.json()
+        self.assertEqual(
+            [(s['device'], s['current']) for s in page['results']],
+            [('Device 1', False)],
+        )
+        self.assertIsNone(page['next'])
+
+    def test_listing_uses_the_user_expiry_index(self):
+        plan = DeviceSession.objects.filter(
+            user=self.user, expires_at__gt=aware_utcnow()
+        ).order_by('-expires_at').explain()
+        self.assertIn('session_user_expires_at_idx', plan)
+
+    def test_only_staff_list_other_users(self):
+        tokens = self.login()
+        response = self.client.get(
+            '/auth/sessions', {'user': str(self.other.pk)},
+            headers=self.bearer(tokens),
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.login('other@example.com')
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(
+            '/auth/sessions', {'user': str(self.other.pk)},
+            headers=self.bearer(tokens),
+        )
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_revoked_session_cannot_refresh(self):
+        phone, laptop = self.login(), self.login(device='Laptop')
+        sid = RefreshToken(laptop['refresh'])[SESSION_CLAIM]
+
+        response = self.client.delete(
+            f'/auth/sessions/{sid}', headers=self.bearer(phone)
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(DeviceSession.objects.count(), 1)
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': laptop['refresh']}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post(
+            '/auth/token/verify/', {'token': laptop['refresh']}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': phone['refresh']}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_refresh_of_a_deleted_session_writes_nothing(self):
+        tokens = self.login()
+        DeviceSession.objects.all().delete()
+        outstanding = OutstandingToken.objects.count()
+
+        response = self.client.post(
+            '/auth/token/refresh/', {'refresh': tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(OutstandingToken.objects.count(), outstanding)
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_cannot_revoke_other_users_sessions(self):
+        tokens = self.login()
+        other = self.login('other@example.com')
+        sid = RefreshToken(other['refresh'])[SESSION_CLAIM]
+
+        response = self.client.delete(
+            f'/auth/sessions/{sid}', headers=self.bearer(tokens)
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(DeviceSession.objects.count(), 2)
+
+
+class BreachedPasswordTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.path = os.path.join(self.tmp, 'corpus.bin')
+
+    def sha1(self, password):
+        return hashlib.sha1(password.encode()).hexdigest().upper()
+
+    def test_build_command_sorts_filters_and_merges_runs(self):
+        source = os.path.join(self.tmp, 'hashes.txt.gz')
+        passwords = [f'password{i}' for i in range(50)]
+        with gzip.open(source, 'wt') as fh:
+            for i, password in enumerate(reversed(passwords)):
+                fh.write(f'{self.sha1(password)}:{i % 3 + 1}\n')
+            fh.write(f'{self.sha1(passwords[0])}:9\nnot a hash\n')
+
+        out = StringIO()
+        call_command(
+            'buildbreachedcorpus', source, output=self.path,
+            min_count=2, chunk_size=7, stdout=out,
+        )
+
+        corpus = BreachedCorpus(self.path)
+        kept = {
+            password for i, password in enumerate(reversed(passwords))
+            if i % 3 + 1 >= 2
+        } | {passwords[0]}
+        self.assertEqual(len(corpus), len(kept))
+        for password in passwords:
+            self.assertEqual(
+                corpus.contains_password(password), password in kept
+            )
+        self.assertIn('skipped=18', out.getvalue())
+
+    def test_lookup_matches_a_scan(self):
+        rng = random.Random(7)
+        for record_size in (20, 10, 1):
+            digests = sorted({rng.randbytes(20) for _ in range(500)})
+            write_corpus(self.path, digests, record_size)
+            corpus = BreachedCorpus(self.path)
+            records = {d[:record_size] for d in digests}
+            probes = digests + [rng.randbytes(20) for _ in range(500)]
+            for digest in probes:
+                self.assertEqual(
+                    digest in corpus, digest[:record_size] in records
+                )
+            corpus.close()
+
+    def test_rejects_files_that_are_not_corpora(self):
+        with open(self.path, 'wb') as fh:
+            fh.write(b'not a corpus')
+        with self.assertRaises(InvalidCorpus):
+            BreachedCorpus(self.path)
+
+    def test_validator_rejects_breached_passwords(self):
+        write_corpus(self.path, [hashlib.sha1(b'S3cure-pass!').digest()])
+        validators = [{
+            'NAME': 'apps.auth.password_validation.BreachedPasswordValidator',
+            'OPTIONS': {'path': self.path},
+        }]
+        with override_settings(AUTH_PASSWORD_VALIDATORS=validators):
+            with self.assertRaises(ValidationError) as ctx:
+                validate_password('S3cure-pass!')
+            self.assertEqual(
+                ctx.exception.error_list[0].code, 'password_breached'
+            )
+            validate_password('An0ther-pass!')
+
+    def test_missing_or_corrupt_corpus_fails_the_system_check(self):
+        validators = [{
+            'NAME': 'apps.auth.password_validation.BreachedPasswordValidator',
+            'OPTIONS': {'path': self.path},
+        }]
+        with override_settings(AUTH_PASSWORD_VALIDATORS=validators):
+            errors = check_breached_corpus(None)  # missing
+            with open(self.path, 'wb') as fh:
+                fh.write(b'not a corpus')
+            errors += check_breached_corpus(None)
+
+            write_corpus(self.path, [hashlib.sha1(b'S3cure-pass!').digest()])
+            self.assertEqual(check_breached_corpus(None), [])
+        self.assertEqual(
+            [error.id for error in errors], ['custom_auth.E001'] * 2
+        )
+
+
+# Long sync interval: the server's background sync never queries mid-test
+@override_settings(REVOCATION_INDEX={'SYNC_INTERVAL': 3600})
+class VerifyServerTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        get_user_cache().clear()
+        self.user = CustomUser.objects.create_user('user@example.com')
+        get_revocation_index().rebuild()
+
+    def blacklisted(self):
+        refresh = RefreshToken.for_user(self.user)
+        refresh.blacklist()
+        return str(refresh)
+
+    def test_verify_matches_token_verify_view(self):
+        valid = str(AccessToken.for_user(self.user))
+        blacklisted = self.blacklisted()
+        revoked = str(AccessToken.for_user(self.user))
+        revoke_all_tokens(CustomUser.objects.filter(pk=self.user.pk))
+
+        for raw in (valid, blacklisted, revoked, 'not-a-token', None):
+            response = self.client.post(
+                '/auth/token/verify/',
+                {} if raw is None else {'token': raw},
+                content_type='application/json',
+            )
+            status, data, _user_id = verify(raw)
+            self.assertEqual(status, response.status_code, raw)
+            self.assertEqual(json.loads(json.dumps(data)), response.json())
+
+    def test_in_memory_defers_to_the_database_only_when_unsure(self):
+        token = str(AccessToken.for_user(self.user))
+        with self.assertNumQueries(0):
+            self.assertIsNone(verify_in_memory(token))  # user not cached
+        cached_user(self.user.pk)
+        blacklisted = self.blacklisted()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                verify_in_memory(token), (200, {}, str(self.user.pk))
+            )
+            self.assertIsNone(verify_in_memory(blacklisted))
+            self.assertEqual(verify_in_memory('not-a-token')[0], 401)
+
+        revoke_all_tokens(CustomUser.objects.filter(pk=self.user.pk))
+        cached_user(self.user.pk)
+        with self.assertNumQueries(0):
+            status, data, _user_id = verify_in_memory(token)
+        self.assertEqual(status, 401)
+        self.assertEqual(data['code'], 'token_not_valid')
+
+    def test_http_requests(self):
+        token = str(AccessToken.for_user(self.user))
+        cached_user(self.user.pk)
+        body = json.dumps({'token': token}).encode()
+        responses = asyncio.run(self.exchange([
+            # Pipelined on one keep-alive connection
+            b'GET /health HTTP/1.1\r\n\r\n',
+            b'POST /verify HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s'
+            % (len(body), body),
+            b'GET /verify HTTP/1.1\r\nAuthorization: Bearer %s\r\n\r\n'
+            % token.encode(),
+            b'POST /verify HTTP/1.1\r\nContent-Length: 1\r\n\r\n[',
+            b'GET /verify HTTP/1.1\r\n\r\n',
+            b'DELETE /verify HTTP/1.1\r\n\r\n',
+            b'GET /nope HTTP/1.1\r\n\r\n',
+            b'POST /verify HTTP/1.1\r\nContent-Length: %d\r\n\r\n'
+            % (MAX_BODY_BYTES + 1),
+        ]))
+
+        self.assertEqual(
+            [status for status, _headers, _data in responses],
+            [200, 200, 200, 400, 401, 405, 404, 413],
+        )
+        for _status, headers, _data in responses[1:3]:
+            self.assertEqual(headers['x-user-id'], str(self.user.pk))
+        self.assertEqual(responses[-1][1]['connection'], 'close')
+
+    async def exchange(self, requests):
+        verifier = VerifyServer(workers=1)
+        server = await verifier.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(b''.join(requests))
+            await writer.drain()
+            return [await self.read_response(reader) for _ in requests]
+        finally:
+            writer.close()
+            server.close()
+            await verifier.close()
+
+    async def read_response(self, reader):
+        head = (await reader.readuntil(b'\r\n\r\n')).decode()
+        status_line, *lines = head.strip().split('\r\n')
+        headers = {}
+        for line in lines:
+            name, _sep, value = line.partition(':')
+            headers[name.lower()] = value.strip()
+        body = await reader.readexactly(int(headers['content-length']))
+        return int(status_line.split()[1]), headers, json.loads(body)
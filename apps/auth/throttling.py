@@ -0,0 +1,35 @@
+# apps/auth/throttling.py
+
+from apps.core.utils.debounce import EmailRateThrottle, IPRateThrottle
+
+
+class TokenObtainIPThrottle(IPRateThrottle):
+    scope = 'token_obtain'
+
+
+class TokenObtainEmailThrottle(EmailRateThrottle):
+    scope = 'token_obtain'
+
+
+# Refresh is limited per IP only: its user is not known until the token has
+# been verified, and keying on unverified claims would let anyone spend
+# another user's budget.
+class TokenRefreshIPThrottle(IPRateThrottle):
+    scope = 'token_refresh'
+
+
+class RegistrationIPThrottle(IPRateThrottle):
+    scope = 'registration'
+
+
+class RegistrationEmailThrottle(EmailRateThrottle):
+    scope = 'registration'
+
+
+# Caps code guesses per email, as the payload itself keeps no attempt count
+class RegistrationConfirmIPThrottle(IPRateThrottle):
+    scope = 'registration_confirm'
+
+
+class RegistrationConfirmEmailThrottle(EmailRateThrottle):
+    scope = 'registration_confirm'
@@ -0,0 +1,87 @@
+# apps/auth/tokens.py
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from apps.auth.services.generations import GENERATION_CLAIM
+from apps.auth.services.keys import get_token_backend
+from apps.auth.services.revocation import get_revocation_index
+
+
+class KeyRingTokenMixin:
+    """
+    Sign and verify through the project's key ring (see services.keys).
+    """
+
+    @property
+    def token_backend(self):
+        return get_token_backend()
+
+
+class GenerationClaimMixin:
+    """
+    Stamp tokens with the user's token generation (see services.generations).
+    Access tokens made from a refresh token, and rotated refresh tokens,
+    inherit the claim.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[GENERATION_CLAIM] = user.token_generation
+        return token
+
+
+class AccessToken(
+    GenerationClaimMixin, KeyRingTokenMixin, tokens.AccessToken
+):
+    pass
+
+
+class UntypedToken(KeyRingTokenMixin, tokens.UntypedToken):
+    pass
+
+
+class RefreshToken(KeyRingTokenMixin, tokens.RefreshToken):
+    """
+    Refresh token whose blacklist check goes through the revocation index.
+    """
+
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user, **claims):
+        """
+        Issue a token carrying the user's generation and any extra
+        ``claims``, all stamped before it is added to the outstanding list
+        (which keeps the encoded token).
+        """
+        # Token.for_user: the payload alone, without the outstanding row
+        token = super(tokens.BlacklistMixin, cls).for_user(user)
+        token[GENERATION_CLAIM] = user.token_generation
+        for claim, value in claims.items():
+            token[claim] = value
+
+        if (
+            'rest_framework_simplejwt.token_blacklist'
+            in settings.INSTALLED_APPS
+        ):
+            OutstandingToken.objects.create(
+                user=user,
+                jti=token[api_settings.JTI_CLAIM],
+                token=str(token),
+                created_at=token.current_time,
+                expires_at=datetime_from_epoch(token['exp']),
+            )
+        return token
+
+    def check_blacklist(self) -> None:
+        jti = self.payload[api_settings.JTI_CLAIM]
+
+        if get_revocation_index().is_revoked(jti):
+            raise TokenError(_('Token is blacklisted'))
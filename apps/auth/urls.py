@@ -1,21 +1,38 @@
 # apps/auth/urls.py
+from django.conf import settings
 from django.urls import path
 
 # Simple JWT's Token
-from rest_framework_simplejwt.views import (
+from rest_framework_simplejwt.views import TokenVerifyView
+
+from apps.auth.views.logout import logout_all
+from apps.auth.views.registration import (
+    registration_confirm,
+    registration_start,
+    registration_start_async,
+)
+from apps.auth.views.sessions import session_list, session_revoke
+from apps.auth.views.token import (
     TokenObtainPairView,
     TokenRefreshView,
+    TokenVerifyBatchView,
+    token_obtain_pair,
 )
-from rest_framework_simplejwt.views import TokenVerifyView
 
-from apps.auth.views.registration import registration_confirm
+# Under ASGI, serve the password-hashing endpoints from async views
+if settings.AUTH_ASYNC_VIEWS:
+    token_obtain_view = token_obtain_pair
+    registration_start_view = registration_start_async
+else:
+    token_obtain_view = TokenObtainPairView.as_view()
+    registration_start_view = registration_start
 
 # Urls pattern
 urlpatterns = [
     # Token (simple_jwt)
     path(
         'token/',  # route
-        TokenObtainPairView.as_view(),  # view
+        token_obtain_view,  # view
         name='token_obtain_pair'  # name
     ),
     path(
@@ -28,8 +45,35 @@ urlpatterns = [
         TokenVerifyView.as_view(),  # view
         name='token_verify'  # name
     ),
+    path(
+        'token/verify/batch',  # route
+        TokenVerifyBatchView.as_view(),  # view
+        name='token_verify_batch'  # name
+    ),
+    path(
+        'logout/all',  # route
+        logout_all,  # view
+        name='logout_all'  # name
+    ),
+
+    # Device sessions
+    path(
+        'sessions',  # route
+        session_list,  # view
+        name='session_list'  # name
+    ),
+    path(
+        'sessions/<uuid:sid>',  # route
+        session_revoke,  # view
+        name='session_revoke'  # name
+    ),
 
     # Registration
+    path(
+        'registration/start',  # route
+        registration_start_view,  # view
+        name='registration_start'  # name
+    ),
     path(
         'registration/confirm',  # route
         registration_confirm,  # view
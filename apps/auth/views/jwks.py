@@ -0,0 +1,29 @@
+# apps/auth/views/jwks.py
+
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from apps.auth.services.keys import get_keyring
+
+EMPTY_JWKS = b'{"keys":[]}'
+
+
+def _jwks_etag(request):
+    keyring = get_keyring()
+    return keyring.etag if keyring else 'empty'
+
+
+@require_GET
+@cache_control(public=True, max_age=300, stale_while_revalidate=86400)
+@condition(etag_func=_jwks_etag)
+def jwks(request) -> HttpResponse:
+    """
+    Public verification keys as a JSON Web Key Set, so relying services can
+    verify tokens locally. The document is built once per key ring.
+    """
+    keyring = get_keyring()
+    return HttpResponse(
+        keyring.jwks if keyring else EMPTY_JWKS,
+        content_type='application/json',
+    )
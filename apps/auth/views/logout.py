@@ -0,0 +1,20 @@
+# apps/auth/views/logout.py
+
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from apps.account.models import CustomUser
+from apps.auth.services.generations import revoke_all_tokens
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def logout_all(request) -> Response:
+    """
+    Log the current user out everywhere: every refresh and access token
+    issued so far, including the one making this request, stops working.
+    One UPDATE, however many sessions are outstanding.
+    """
+    revoke_all_tokens(CustomUser.objects.filter(pk=request.user.pk))
+    return Response(status=status.HTTP_204_NO_CONTENT)
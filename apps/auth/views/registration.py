@@ -1,23 +1,91 @@
 # apps/auth/views/registration.py
 
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import (
     permissions, status
 )
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view, permission_classes, throttle_classes
+)
 from rest_framework.response import Response
 
-from apps.auth.serializers import RegistrationSerializer
+from apps.auth.serializers import (
+    RegistrationConfirmSerializer,
+    RegistrationStartSerializer,
+)
+from apps.auth.services.hashing import amake_password
+from apps.auth.throttling import (
+    RegistrationConfirmEmailThrottle,
+    RegistrationConfirmIPThrottle,
+    RegistrationEmailThrottle,
+    RegistrationIPThrottle,
+)
+from apps.core.utils.admission import admission_controlled
+from apps.core.utils.debounce import throttled
+from apps.core.utils.fastjson import JSONResponse, parse_request
+
+START_DETAIL = 'Check your email for the verification code.'
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([RegistrationIPThrottle, RegistrationEmailThrottle])
+@admission_controlled('registration')
+def registration_start(request) -> Response:
+    """
+    Validates the registration, emails a one-time code and returns a signed
+    payload to send back with it to confirm. Writes no database rows.
+    """
+    serializer = RegistrationStartSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    payload = serializer.save()
+
+    return Response(
+        {'detail': START_DETAIL, 'payload': payload},
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+@csrf_exempt
+@require_POST
+@throttled('registration')
+@admission_controlled('registration')
+async def registration_start_async(request) -> JSONResponse:
+    """
+    Async registration_start. The password is hashed on the bounded hashing
+    pool; validation and sending run in a worker thread.
+    """
+    data = parse_request(request)
+    if data is None:
+        return JSONResponse({'detail': 'JSON parse error.'}, status=400)
+
+    serializer = RegistrationStartSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JSONResponse(serializer.errors, status=400)
+
+    password = serializer.validated_data.get('password')
+    password_hash = await amake_password(password) if password else None
+    payload = await sync_to_async(serializer.save)(password_hash=password_hash)
+
+    return JSONResponse(
+        {'detail': START_DETAIL, 'payload': payload}, status=202
+    )
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([
+    RegistrationConfirmIPThrottle, RegistrationConfirmEmailThrottle
+])
 def registration_confirm(request) -> Response:
     """
-    Registers user (accepts, third party, therefore password is not required)
-    anyone can call this.
+    Creates the user from a registration payload and its one-time code.
+    The payload and code are verified in memory before the single INSERT.
     """
     # Bind request data to the serializer
-    serializer = RegistrationSerializer(data=request.data)
+    serializer = RegistrationConfirmSerializer(data=request.data)
     # Validata, or throw a 400 with detailed error
     serializer.is_valid(raise_exception=True)
     # Perform the create() logic and get back the new user
@@ -0,0 +1,68 @@
+# apps/auth/views/sessions.py
+
+from uuid import UUID
+
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.auth.models import DeviceSession
+from apps.auth.serializers import DeviceSessionSerializer
+from apps.auth.services.sessions import revoke_session
+
+
+class SessionPagination(CursorPagination):
+    """
+    Keyset pages over the (user, expires_at) index. Rotation pushes
+    ``expires_at`` forward, so this is most recently used first.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-expires_at'
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def session_list(request) -> Response:
+    """
+    The caller's active sessions, one cursor page at a time. Staff may
+    pass ``?user=<id>`` to list another user's.
+    """
+    user_id = request.user.pk
+    if 'user' in request.query_params:
+        if not request.user.is_staff:
+            raise PermissionDenied()
+        try:
+            user_id = UUID(request.query_params['user'])
+        except ValueError:
+            raise ValidationError({'user': ['Must be a valid UUID.']})
+
+    sessions = DeviceSession.objects.filter(
+        user_id=user_id, expires_at__gt=aware_utcnow()
+    )
+    paginator = SessionPagination()
+    page = paginator.paginate_queryset(sessions, request)
+    serializer = DeviceSessionSerializer(
+        page, many=True, context={'request': request}
+    )
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def session_revoke(request, sid) -> Response:
+    """
+    Revoke one of the caller's sessions (staff: anyone's); its refresh
+    token stops working at once.
+    """
+    sessions = DeviceSession.objects.all()
+    if not request.user.is_staff:
+        sessions = sessions.filter(user_id=request.user.pk)
+    revoke_session(get_object_or_404(sessions, pk=sid))
+    return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,116 @@
+# apps/auth/views/token.py
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework_simplejwt import views as jwt_views
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.auth.serializers import (
+    TokenObtainPairSerializer,
+    TokenVerifyBatchSerializer,
+)
+from apps.auth.services.hashing import amake_password, averify_password
+from apps.auth.throttling import (
+    TokenObtainEmailThrottle,
+    TokenObtainIPThrottle,
+    TokenRefreshIPThrottle,
+)
+from apps.core.utils.admission import admission_controlled
+from apps.core.utils.debounce import throttled
+from apps.core.utils.fastjson import JSONResponse, parse_request
+
+
+def string_field_errors(data, fields):
+    """
+    Errors for ``fields`` that are missing or not strings, worded as DRF's
+    ``CharField`` words them.
+    """
+    errors = {}
+    for field in fields:
+        value = data.get(field)
+        if not value:
+            errors[field] = ['This field is required.']
+        elif not isinstance(value, str):
+            errors[field] = ['Not a valid string.']
+    return errors
+
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    """
+    TokenObtainPairView, rate limited per IP and email, behind the
+    ``token_obtain`` admission limiter.
+    """
+
+    throttle_classes = [TokenObtainIPThrottle, TokenObtainEmailThrottle]
+
+    @admission_controlled('token_obtain')
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    throttle_classes = [TokenRefreshIPThrottle]
+
+
+class TokenVerifyBatchView(jwt_views.TokenViewBase):
+    """
+    Takes up to TOKEN_VERIFY_BATCH_MAX tokens and returns, for each one,
+    whether it is valid plus its decoded claims.
+    """
+
+    serializer_class = TokenVerifyBatchSerializer
+
+
+@csrf_exempt
+@require_POST
+@throttled('token_obtain')
+@admission_controlled('token_obtain')
+async def token_obtain_pair(request) -> JSONResponse:
+    """
+    Async TokenObtainPairView. Password hashing runs on the bounded hashing
+    pool, so a login storm cannot hold up the cheap endpoints.
+    """
+    data = parse_request(request)
+    if data is None:
+        return JSONResponse({'detail': 'JSON parse error.'}, status=400)
+
+    user_model = get_user_model()
+    username_field = user_model.USERNAME_FIELD
+    errors = string_field_errors(data, (username_field, 'password'))
+    if errors:
+        return JSONResponse(errors, status=400)
+
+    try:
+        user = await sync_to_async(
+            user_model._default_manager.get_by_natural_key
+        )(data[username_field])
+    except user_model.DoesNotExist:
+        user = None
+
+    if user is None:
+        # Hash anyway so timing does not reveal which accounts exist
+        await amake_password(data['password'])
+        is_correct = False
+    else:
+        is_correct, must_update = await averify_password(
+            data['password'], user.password
+        )
+        if is_correct and must_update:
+            user.password = await amake_password(data['password'])
+            await user.asave(update_fields=['password'])
+
+    if not is_correct or not api_settings.USER_AUTHENTICATION_RULE(user):
+        response = JSONResponse(
+            {'detail': 'No active account found with the given credentials'},
+            status=401,
+        )
+        response['WWW-Authenticate'] = f'{AUTH_HEADER_TYPES[0]} realm="api"'
+        return response
+
+    tokens = await sync_to_async(TokenObtainPairSerializer.issue_tokens)(
+        user, request
+    )
+    return JSONResponse(tokens)
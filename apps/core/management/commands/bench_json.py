@@ -0,0 +1,85 @@
+# apps/core/management/commands/bench_json.py
+
+import io
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework import parsers, renderers
+
+from apps.account.models import CustomUser, CustomUserProfile
+from apps.account.serializers import UserReadSerializer
+from apps.auth.tokens import AccessToken
+from apps.core.parsers import JSONParser
+from apps.core.renderers import JSONRenderer
+from apps.core.utils.bench import summarize, timed
+
+IMPLEMENTATIONS = {
+    'stdlib': (renderers.JSONRenderer(), parsers.JSONParser()),
+    'ujson': (JSONRenderer(), JSONParser()),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's stdlib JSON renderer/parser with the project's ujson "
+        "ones on the /account/me and token obtain payloads"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50_000)
+
+    def handle(self, *args, **options):
+        n = options['iterations']
+        payloads = self.payloads()
+
+        stdlib_renderer = IMPLEMENTATIONS['stdlib'][0]
+        for name, (render_data, parse_body) in payloads.items():
+            expected = stdlib_renderer.render(render_data)
+            body = stdlib_renderer.render(parse_body)
+            results = {}
+            for impl, (renderer, parser) in IMPLEMENTATIONS.items():
+                # Only time implementations that agree with the stdlib
+                if renderer.render(render_data) != expected:
+                    raise CommandError(f'{impl} renders {name} differently')
+                if parser.parse(io.BytesIO(body)) != parse_body:
+                    raise CommandError(f'{impl} parses {name} differently')
+                results[impl] = (
+                    summarize(timed(
+                        lambda i: renderer.render(render_data), n
+                    )),
+                    summarize(timed(
+                        lambda i: parser.parse(io.BytesIO(body)), n
+                    )),
+                )
+
+            for kind, index in (('render', 0), ('parse', 1)):
+                us = {
+                    impl: 1e6 / summary[index]['ops_per_sec']
+                    for impl, summary in results.items()
+                }
+                self.stdout.write(
+                    f'{name:>12} {kind:>6}: '
+                    f'stdlib={us["stdlib"]:.2f}us ujson={us["ujson"]:.2f}us '
+                    f'({us["stdlib"] / us["ujson"]:.1f}x)'
+                )
+
+    def payloads(self):
+        """
+        ``{name: (response data, request body data)}`` for each endpoint.
+        """
+        now = timezone.now()
+        user = CustomUser(id=uuid4(), email='user@example.com')
+        user.profile = CustomUserProfile(
+            user=user, phone='+2348012345678', created_at=now, updated_at=now
+        )
+        me = UserReadSerializer(user).data
+
+        access = str(AccessToken.for_user(user))
+        return {
+            'account/me': (me, me),
+            'auth/token': (
+                {'refresh': access, 'access': access},
+                {'email': user.email, 'password': 'S3cure-pass!'},
+            ),
+        }
@@ -0,0 +1,115 @@
+# apps/core/management/commands/bench_profiles.py
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ('dev', 'prod', 'api')
+
+# Runs in a fresh interpreter per profile
+CHILD = '''
+import json, sys, time
+
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver, resolve
+get_resolver().url_patterns  # the first request would import the URLconf
+cold_start = time.perf_counter() - start
+
+from django.conf import settings
+from django.test import RequestFactory
+from apps.core.utils.bench import summarize, timed
+
+n, paths = int(sys.argv[1]), sys.argv[2:]
+factory = RequestFactory(SERVER_NAME='localhost')
+result = {
+    'cold_start_ms': round(cold_start * 1000, 1),
+    'installed_apps': len(settings.INSTALLED_APPS),
+    'middleware': len(settings.MIDDLEWARE),
+    'paths': {},
+}
+for path in paths:
+    view = resolve(path).func
+    requests = [factory.get(path) for _ in range(n)]
+    for request in requests[:50]:
+        application.get_response(factory.get(path))  # warm up
+    stack = summarize(
+        timed(lambda i: application.get_response(requests[i]), n)
+    )
+    requests = [factory.get(path) for _ in range(n)]
+    bare = summarize(timed(lambda i: view(requests[i]), n))
+    result['paths'][path] = {
+        'request_us': round(1e6 / stack['ops_per_sec'], 1),
+        'view_us': round(1e6 / bare['ops_per_sec'], 1),
+        'overhead_us': round(
+            1e6 / stack['ops_per_sec'] - 1e6 / bare['ops_per_sec'], 1
+        ),
+    }
+print(json.dumps(result))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the settings profiles (config.settings.dev/prod/api): "
+        "cold start (app loading + URLconf, in a fresh interpreter) and "
+        "per-request middleware/routing overhead over the bare view"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--starts', type=int, default=5,
+            help='Fresh interpreters per profile (median cold start)'
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Request path to time (repeatable; default: a plain '
+                 'Django view and a DRF view that need no database)'
+        )
+        parser.add_argument(
+            '--profile', action='append', dest='profiles', choices=PROFILES
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/.well-known/jwks.json', '/endpoints']
+        env = {
+            **os.environ,
+            'DJANGO_SECRET_KEY': os.environ.get(
+                'DJANGO_SECRET_KEY', 'bench-profiles-not-a-secret'
+            ),
+            'DJANGO_ALLOWED_HOSTS': 'localhost',
+            'METRICS_TOKEN': os.environ.get(
+                'METRICS_TOKEN', 'bench-profiles-not-a-secret'
+            ),
+        }
+
+        results = {}
+        for profile in options['profiles'] or PROFILES:
+            env['DJANGO_SETTINGS_MODULE'] = f'config.settings.{profile}'
+            runs = [
+                self.run_child(env, options['requests'], paths)
+                for _ in range(options['starts'])
+            ]
+            result = runs[-1]
+            result['cold_start_ms'] = statistics.median(
+                run['cold_start_ms'] for run in runs
+            )
+            results[profile] = result
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_child(self, env, requests, paths):
+        process = subprocess.run(
+            [sys.executable, '-c', CHILD, str(requests), *paths],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr)
+        return json.loads(process.stdout)
@@ -0,0 +1,362 @@
+# apps/core/management/commands/benchendpoints.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, RequestFactory, override_settings
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.account.models import CustomUser, CustomUserProfile
+from apps.account.services.user_cache import get_user_cache
+from apps.auth.models import DeviceSession
+from apps.auth.services.registration import issue_registration
+from apps.auth.services.revocation import get_revocation_index
+from apps.auth.services.sessions import SESSION_CLAIM
+from apps.auth.tokens import AccessToken, RefreshToken
+from apps.core.utils.bench import isolated_database, summarize
+from apps.core.views import api_endpoints
+
+PASSWORD = 'S3cure-pass!'
+
+# api_endpoints name -> method building the requests for it
+SCENARIOS = {
+    'auth/token': 'token_obtain',
+    'auth/token/refresh': 'token_refresh',
+    'auth/token/verify': 'token_verify',
+    'auth/token/verify/batch': 'token_verify_batch',
+    'auth/logout/all': 'logout_all',
+    'auth/sessions': 'sessions',
+    '.well-known/jwks.json': 'anonymous',
+    'auth/register/start': 'registration_start',
+    'auth/register/confirm': 'registration_confirm',
+    'admission': 'staff',
+    'metrics': 'staff',
+    'account/me': 'user',
+    'account/export': 'staff',
+}
+
+# Endpoints that hash a password per request
+HASHING = {'auth/token', 'auth/register/start'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every route listed by apps.core.views.api_endpoints "
+        "in-process against a seeded throwaway database: throughput, "
+        "p50/p95/p99 latency and queries per request, as JSON. With "
+        "--baseline, fail on regressions against a previous run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--hashing-requests', type=int, default=20,
+            help='Requests for endpoints that hash passwords'
+        )
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--warmup', type=int, default=5,
+            help='Untimed requests per endpoint first (caches, connections)'
+        )
+        parser.add_argument(
+            '--users', type=int, default=1000, help='Seeded users'
+        )
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help='Only run this api_endpoints entry (repeatable)'
+        )
+        parser.add_argument('--output', help='Write results JSON here')
+        parser.add_argument('--baseline', help='Results JSON to compare to')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed relative p95/throughput regression (default 0.25)'
+        )
+        parser.add_argument(
+            '--with-rate-limits', action='store_true',
+            help='Keep RATE_LIMITS (off by default: one client IP)'
+        )
+        parser.add_argument(
+            '--with-admission-control', action='store_true',
+            help='Keep ADMISSION_CONTROL (off by default, so saturated '
+                 'hashing endpoints show latency rather than 503s)'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            overrides = {
+                'REGISTRATION': {
+                    'OTP_SENDER':
+                        'apps.auth.services.registration.FileOTPSender',
+                    'OTP_SENDER_OPTIONS': {
+                        'path': os.path.join(tmp, 'otp.jsonl'),
+                    },
+                },
+            }
+            if not options['with_rate_limits']:
+                overrides['RATE_LIMITS'] = {}
+            if not options['with_admission_control']:
+                overrides['ADMISSION_CONTROL'] = {}
+
+            with override_settings(**overrides), isolated_database():
+                self.seed(options['users'])
+                endpoints = api_endpoints(RequestFactory().get('/')).data
+                results = self.run_all(endpoints, options)
+
+        report = {
+            'meta': {
+                'concurrency': options['concurrency'],
+                'users': options['users'],
+            },
+            'endpoints': results,
+        }
+        for name, summary in results.items():
+            self.stdout.write(f'{name:>24}: {summary}')
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+
+        if baseline is not None:
+            self.compare(results, baseline['endpoints'], options['tolerance'])
+
+    def seed(self, count):
+        encoded = make_password(PASSWORD)
+        users = [
+            CustomUser(email=f'user{i}@example.com', password=encoded)
+            for i in range(count)
+        ]
+        users.append(CustomUser(
+            email='staff@example.com', password=encoded, is_staff=True
+        ))
+        CustomUser.objects.bulk_create(users, batch_size=1000)
+        CustomUserProfile.objects.bulk_create(
+            (CustomUserProfile(user=user) for user in users), batch_size=1000
+        )
+        self.users = users[:-1] or users
+        self.staff = users[-1]
+        get_revocation_index().rebuild()
+
+    def run_all(self, endpoints, options):
+        results = {}
+        for name, entry in endpoints.items():
+            if options['endpoints'] and name not in options['endpoints']:
+                continue
+            if name not in SCENARIOS:
+                raise CommandError(
+                    f'No benchmark scenario for api_endpoints entry {name!r}'
+                )
+            count = (
+                options['hashing_requests'] if name in HASHING
+                else options['requests']
+            )
+            builder = getattr(self, f'requests_{SCENARIOS[name]}')
+            requests = [
+                (entry['method'], urlsplit(entry['url']).path, data, headers)
+                for data, headers in builder(count + options['warmup'])
+            ]
+            # Every endpoint starts cold: nothing cached by the ones before
+            get_user_cache().clear()
+            get_revocation_index().rebuild()
+            warmup = requests[:options['warmup']]
+            if warmup:
+                self.run(warmup, 1)
+            results[name] = self.run(
+                requests[options['warmup']:], options['concurrency']
+            )
+        return results
+
+    def run(self, requests, concurrency):
+        latencies, queries, errors = [], [], []
+        lock = threading.Lock()
+        shares = [requests[i::concurrency] for i in range(concurrency)]
+
+        def worker(share):
+            client = Client()
+            executed = [0]
+            local = ([], [], [])
+
+            def count_queries(execute, sql, params, many, context):
+                executed[0] += 1
+                return execute(sql, params, many, context)
+
+            try:
+                # Connections are per thread, so the wrapper is too
+                with connection.execute_wrapper(count_queries):
+                    for method, path, data, headers in share:
+                        before = executed[0]
+                        start = time.perf_counter()
+                        response = self.send(
+                            client, method, path, data, headers
+                        )
+                        local[0].append(time.perf_counter() - start)
+                        local[1].append(executed[0] - before)
+                        if response.status_code >= 400:
+                            local[2].append(response.status_code)
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local[0])
+                queries.extend(local[1])
+                errors.extend(local[2])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, shares))
+        summary = summarize(latencies, time.perf_counter() - started)
+        summary['queries_per_request'] = round(
+            sum(queries) / max(len(queries), 1), 2
+        )
+        summary['errors'] = len(errors)
+        return summary
+
+    def send(self, client, method, path, data, headers):
+        if method == 'GET':
+            response = client.get(path, data, headers=headers)
+        else:
+            response = client.post(
+                path, data, content_type='application/json', headers=headers
+            )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def compare(self, results, baseline, tolerance):
+        failures = []
+        for name, current in results.items():
+            if current['errors']:
+                failures.append(f'{name}: {current["errors"]} errors')
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if current['queries_per_request'] > before['queries_per_request']:
+                failures.append(
+                    f'{name}: queries/request '
+                    f'{before["queries_per_request"]} -> '
+                    f'{current["queries_per_request"]}'
+                )
+            if current['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                failures.append(
+                    f'{name}: p95 {before["p95_ms"]}ms -> '
+                    f'{current["p95_ms"]}ms'
+                )
+            floor = before['ops_per_sec'] * (1 - tolerance)
+            if current['ops_per_sec'] < floor:
+                failures.append(
+                    f'{name}: throughput {before["ops_per_sec"]}/s -> '
+                    f'{current["ops_per_sec"]}/s'
+                )
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(f'REGRESSION {failure}')
+            raise CommandError(f'{len(failures)} regression(s) vs baseline')
+        self.stdout.write(self.style.SUCCESS('No regressions vs baseline'))
+
+    # Request builders: return [(data, headers), ...]
+
+    def bearer(self, token):
+        return {'Authorization': f'Bearer {token}'}
+
+    def user_at(self, i):
+        return self.users[i % len(self.users)]
+
+    def requests_anonymous(self, n):
+        return [({}, {})] * n
+
+    def requests_user(self, n):
+        return [
+            ({}, self.bearer(AccessToken.for_user(self.user_at(i))))
+            for i in range(n)
+        ]
+
+    def requests_staff(self, n):
+        headers = self.bearer(AccessToken.for_user(self.staff))
+        return [({'limit': 100}, headers)] * n
+
+    def requests_token_obtain(self, n):
+        return [
+            ({'email': self.user_at(i).email, 'password': PASSWORD}, {})
+            for i in range(n)
+        ]
+
+    def requests_token_refresh(self, n):
+        # Rotation blacklists each token, so every request needs its own
+        return [
+            ({'refresh': str(RefreshToken.for_user(self.user_at(i)))}, {})
+            for i in range(n)
+        ]
+
+    def requests_token_verify(self, n):
+        return [
+            ({'token': str(AccessToken.for_user(self.user_at(i)))}, {})
+            for i in range(n)
+        ]
+
+    def requests_token_verify_batch(self, n, size=20):
+        return [
+            ({'tokens': [
+                str(AccessToken.for_user(self.user_at(i + j)))
+                for j in range(size)
+            ]}, {})
+            for i in range(n)
+        ]
+
+    def requests_logout_all(self, n):
+        # Users of their own: logging out would revoke the shared users'
+        # tokens for the endpoints benchmarked after this one
+        users = CustomUser.objects.bulk_create(
+            CustomUser(email=f'logout{i}@example.com') for i in range(n)
+        )
+        return [
+            ({}, self.bearer(AccessToken.for_user(user))) for user in users
+        ]
+
+    def requests_sessions(self, n, per_user=5, heavy=500):
+        # A heavy user among many others, expired sessions included
+        now = aware_utcnow()
+        sessions = [
+            DeviceSession(
+                user=user, refresh_jti=uuid4().hex, last_used_at=now,
+                expires_at=now + timedelta(days=(j % 3) - 1, seconds=j),
+            )
+            for user in self.users
+            for j in range(heavy if user is self.users[0] else per_user)
+        ]
+        DeviceSession.objects.bulk_create(sessions, batch_size=1000)
+        token = AccessToken.for_user(self.users[0])
+        token[SESSION_CLAIM] = str(sessions[0].pk)
+        return [({}, self.bearer(token))] * n
+
+    def requests_registration_start(self, n):
+        return [
+            ({
+                'email': f'start{i}@example.com',
+                'password': PASSWORD,
+                'confirm_password': PASSWORD,
+            }, {})
+            for i in range(n)
+        ]
+
+    def requests_registration_confirm(self, n):
+        requests = []
+        for i in range(n):
+            email = f'confirm{i}@example.com'
+            payload, otp = issue_registration(email)
+            requests.append(
+                ({'email': email, 'otp': otp, 'payload': payload}, {})
+            )
+        return requests
@@ -0,0 +1,103 @@
+# apps/core/middleware.py
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from apps.core.utils.database import (
+    allow_replica_reads,
+    begin_routing,
+    end_routing,
+)
+from apps.core.utils.metrics import (
+    begin_request,
+    end_request,
+    get_metrics_settings,
+    instrument_connection,
+)
+
+UNMATCHED = '<unmatched>'
+
+
+def route_of(request) -> str:
+    # The URL pattern, not the path, keeps label cardinality bounded
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None else UNMATCHED
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status code, DB queries and password hashing time per
+    route (apps.core.utils.metrics). Put it first so it times everything.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_metrics_settings()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        instrument_connection(connection)
+        record, token = begin_request()
+        response = self.get_response(request)
+        end_request(
+            record, token, request.method, route_of(request),
+            response.status_code
+        )
+        return response
+
+    async def __acall__(self, request):
+        record, token = begin_request()
+        response = await self.get_response(request)
+        end_request(
+            record, token, request.method, route_of(request),
+            response.status_code
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets views named in ``DATABASE_REPLICA_ROUTES`` read from a replica
+    (apps.core.utils.database.ReplicaRouter) and unpins every request from
+    the primary once it finishes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', ()):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.routes = frozenset(settings.DATABASE_REPLICA_ROUTES)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = begin_routing()
+        try:
+            return self.get_response(request)
+        finally:
+            end_routing(tokens)
+
+    async def __acall__(self, request):
+        tokens = begin_routing()
+        try:
+            return await self.get_response(request)
+        finally:
+            end_routing(tokens)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.url_name in self.routes:
+            allow_replica_reads()
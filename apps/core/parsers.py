@@ -0,0 +1,24 @@
+# apps/core/parsers.py
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from apps.core.utils.fastjson import loads
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    DRF's JSONParser on ujson.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            raw = stream.read() if stream is not None else b''
+            if encoding.lower().replace('-', '') != 'utf8':
+                raw = raw.decode(encoding)
+            return loads(raw, strict=self.strict)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
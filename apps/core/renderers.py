@@ -0,0 +1,27 @@
+# apps/core/renderers.py
+
+from rest_framework import renderers
+
+from apps.core.utils.fastjson import dumps
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    DRF's JSONRenderer (same output, options and settings) on ujson.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        ret = dumps(
+            data,
+            indent=indent,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+        )
+
+        # Valid JSON, but not valid JavaScript (see the parent class)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
@@ -1,8 +1,10 @@
 # Account url config
 from django.urls import path
 
-from .views import api_endpoints
+from .views import admission_status, api_endpoints, metrics
 
 urlpatterns = [
-        path('endpoints', api_endpoints, name='api_endpoints')
+        path('endpoints', api_endpoints, name='api_endpoints'),
+        path('admission', admission_status, name='admission_status'),
+        path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,250 @@
+# apps/core/utils/admission.py
+
+import asyncio
+import functools
+import inspect
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class AdmissionRejected(APIException):
+    """
+    503 raised when a limiter is saturated. DRF turns ``wait`` into a
+    ``Retry-After`` header.
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, please retry shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class _Waiter:
+    """
+    A queued caller. ``release`` hands its slot over by setting ``granted``
+    (under the limiter's lock), then calls ``wake``.
+    """
+
+    __slots__ = ('granted', 'wake')
+
+    def __init__(self, wake):
+        self.granted = False
+        self.wake = wake
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded wait queue and a queue-time deadline.
+
+    Up to ``max_concurrent`` requests run at once, up to ``max_queue`` more
+    wait at most ``queue_timeout`` seconds (from arrival) for a slot, and
+    everything else is rejected immediately.
+
+    Sync callers wait on an event, async callers on a future of their own
+    loop; both share one FIFO, and ``release`` hands the slot straight to
+    the oldest waiter.
+    """
+
+    def __init__(
+        self, name, max_concurrent, max_queue=0, queue_timeout=0.0,
+        retry_after=1
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            return self._take()
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if allowed; raise
+        ``AdmissionRejected`` otherwise.
+        """
+        event = threading.Event()
+        waiter = self._enqueue(event.set)
+        if waiter is None:
+            return
+        event.wait(self.queue_timeout)
+        self._settle(waiter)
+
+    async def aacquire(self):
+        """
+        ``acquire`` for async callers: waits on the event loop, not in a
+        thread.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = self._enqueue(
+            lambda: loop.call_soon_threadsafe(_resolve, future)
+        )
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()  # granted as we were cancelled: pass it on
+            raise
+        self._settle(waiter)
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot moves to the next waiter; in_flight is unchanged
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.admitted += 1
+            else:
+                self.in_flight -= 1
+                return
+        waiter.wake()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'queued': len(self._waiters),
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+            }
+
+    def _take(self) -> bool:
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        return False
+
+    def _enqueue(self, wake):
+        """
+        Take a free slot (None) or queue a waiter; reject if the queue is
+        full.
+        """
+        with self._lock:
+            if self._take():
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected(self.retry_after)
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _settle(self, waiter):
+        # After the wait: either a slot was handed over, or the deadline
+        # passed and the waiter leaves the queue
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+            self.rejected += 1
+        raise AdmissionRejected(self.retry_after)
+
+
+_limiters = None
+
+
+def get_limiters():
+    """
+    Return the limiters configured by ``ADMISSION_CONTROL``, by scope.
+    """
+    global _limiters
+    if _limiters is None:
+        _limiters = {
+            scope: AdmissionLimiter(
+                scope,
+                max_concurrent=conf['MAX_CONCURRENT'],
+                max_queue=conf.get('MAX_QUEUE', 0),
+                queue_timeout=conf.get('QUEUE_TIMEOUT', 0.0),
+                retry_after=conf.get('RETRY_AFTER', 1),
+            )
+            for scope, conf in getattr(
+                settings, 'ADMISSION_CONTROL', {}
+            ).items()
+        }
+    return _limiters
+
+
+@receiver(setting_changed)
+def _reset_limiters(setting, **kwargs):
+    global _limiters
+    if setting == 'ADMISSION_CONTROL':
+        _limiters = None
+
+
+def admission_controlled(scope):
+    """
+    Run the decorated view (function or method) under the ``scope`` limiter.
+
+    Sync views raise ``AdmissionRejected`` for DRF to render; async (plain
+    Django) views return the 503 response directly.
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                limiter = get_limiters().get(scope)
+                if limiter is None:
+                    return await view(*args, **kwargs)
+                try:
+                    await limiter.aacquire()
+                except AdmissionRejected as exc:
+                    response = JsonResponse(
+                        {'detail': str(exc.detail)}, status=exc.status_code
+                    )
+                    response['Retry-After'] = str(exc.wait)
+                    return response
+                try:
+                    return await view(*args, **kwargs)
+                finally:
+                    limiter.release()
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter = get_limiters().get(scope)
+            if limiter is None:
+                return view(*args, **kwargs)
+            limiter.acquire()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                limiter.release()
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+# apps/core/utils/bench.py
+
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@contextmanager
+def isolated_database(verbosity=0):
+    """
+    Run the block against throwaway test databases, so benchmarks never
+    touch real data. SQLite test databases are files rather than shared
+    memory, so concurrent benchmark threads behave like a real deployment.
+    """
+    tmpdir = tempfile.mkdtemp(prefix='bench-')
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                tmpdir, f'{alias}.sqlite3'
+            )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity)
+        teardown_test_environment()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def timed(fn, iterations):
+    """
+    Call ``fn(i)`` for each iteration and return the latencies in seconds.
+    """
+    latencies = []
+    clock = time.perf_counter
+    for i in range(iterations):
+        start = clock()
+        fn(i)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed=None):
+    """
+    Reduce a list of latencies (seconds) to throughput and percentiles (ms).
+    """
+    ordered = sorted(latencies)
+    elapsed = elapsed if elapsed is not None else sum(ordered)
+    return {
+        'requests': len(ordered),
+        'ops_per_sec': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+    }
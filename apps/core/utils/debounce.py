@@ -0,0 +1,311 @@
+# apps/core/utils/debounce.py
+
+import functools
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+from apps.core.utils.fastjson import parse_request
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse ``'<count>/[<n>]<period>'`` (period ``s``, ``min``, ``hour``,
+    ``day`` as in DRF, optionally multiplied: ``'5/10min'``) into
+    ``(count, seconds)``.
+    """
+    match = re.fullmatch(r'(\d+)/(\d*)([smhd])[a-z]*', rate)
+    if not match:
+        raise ImproperlyConfigured(f'Invalid rate {rate!r}')
+    count, multiplier, period = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[period]
+
+
+class LocalBackend:
+    """
+    Per-process limiter state, bounded to ``max_keys`` (least recently
+    used keys are forgotten first).
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._state = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key, default):
+        state = self._state.get(key)
+        if state is None:
+            state = self._state[key] = default
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        else:
+            self._state.move_to_end(key)
+        return state
+
+    def token_bucket(self, key, capacity, refill, now):
+        with self._lock:
+            state = self._get(key, [capacity, now])
+            tokens = min(capacity, state[0] + (now - state[1]) * refill)
+            state[1] = now
+            if tokens >= 1:
+                state[0] = tokens - 1
+                return 0.0
+            state[0] = tokens
+            return (1 - tokens) / refill
+
+    def sliding_window(self, key, limit, period, now):
+        window, elapsed = divmod(now, period)
+        with self._lock:
+            # [window, count in window, count in the window before]
+            state = self._get(key, [window, 0, 0])
+            if state[0] != window:
+                previous = state[1] if state[0] == window - 1 else 0
+                state[:] = [window, 0, previous]
+            wait = window_wait(state[2], state[1], limit, period, elapsed)
+            if not wait:
+                state[1] += 1
+            return wait
+
+
+class CacheBackend:
+    """
+    Limiter state in a Django cache, shared by every process using it.
+
+    Only ``incr`` is atomic across processes, so a token bucket is enforced
+    as a sliding window of ``capacity`` requests per ``capacity / refill``
+    seconds: the same burst size and long-run rate.
+    """
+
+    def __init__(self, alias='default', prefix='ratelimit:'):
+        self.cache = caches[alias]
+        self.prefix = prefix
+
+    def token_bucket(self, key, capacity, refill, now):
+        return self.sliding_window(key, capacity, capacity / refill, now)
+
+    def sliding_window(self, key, limit, period, now):
+        window, elapsed = divmod(now, period)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        current_key = f'{self.prefix}{digest}:{period:g}:{window:.0f}'
+        previous_key = f'{self.prefix}{digest}:{period:g}:{window - 1:.0f}'
+
+        timeout = math.ceil(period * 2)
+        self.cache.add(current_key, 0, timeout)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(current_key, 1, timeout)
+            current = 1
+        previous = self.cache.get(previous_key, 0)
+
+        wait = window_wait(previous, current - 1, limit, period, elapsed)
+        if wait:
+            self.cache.decr(current_key)
+        return wait
+
+
+def window_wait(previous, current, limit, period, elapsed):
+    """
+    Seconds until one more request fits the sliding window estimate
+    ``previous * (1 - elapsed / period) + current``; 0.0 if it fits now.
+    """
+    if previous * (1 - elapsed / period) + current + 1 <= limit:
+        return 0.0
+    if current + 1 > limit or not previous:
+        return period - elapsed
+    # The previous window's weight decays until the estimate fits
+    fits_at = (1 - (limit - current - 1) / previous) * period
+    return max(fits_at - elapsed, 1e-3)
+
+
+class RateLimiter:
+    """
+    A named limit: ``rate`` requests per period, by ``token_bucket``
+    (bursts up to ``burst``) or ``sliding_window``.
+    """
+
+    def __init__(
+        self, scope, rate, algorithm='token_bucket', burst=None,
+        backend=None, clock=time.time
+    ):
+        self.scope = scope
+        self.count, self.period = parse_rate(rate)
+        self.algorithm = algorithm
+        self.burst = burst or self.count
+        self.backend = backend or LocalBackend()
+        self.clock = clock
+        if algorithm not in ('token_bucket', 'sliding_window'):
+            raise ImproperlyConfigured(
+                f'Unknown rate limit algorithm {algorithm!r}'
+            )
+
+    def hit(self, key):
+        """
+        Count one request for ``key``; return 0.0 if it is allowed, else
+        the seconds to wait before retrying.
+        """
+        key = f'{self.scope}:{key}'
+        if self.algorithm == 'token_bucket':
+            return self.backend.token_bucket(
+                key, self.burst, self.count / self.period, self.clock()
+            )
+        return self.backend.sliding_window(
+            key, self.count, self.period, self.clock()
+        )
+
+
+_limiters = None
+
+
+def get_rate_limiters():
+    """
+    Return the limiters configured by ``RATE_LIMITS``, by scope.
+    """
+    global _limiters
+    if _limiters is None:
+        conf = getattr(settings, 'RATE_LIMITS', {})
+        if conf.get('BACKEND', 'local') == 'cache':
+            backend = CacheBackend(conf.get('CACHE', 'default'))
+        else:
+            backend = LocalBackend(conf.get('MAX_KEYS', 100_000))
+        _limiters = {
+            scope: RateLimiter(
+                scope,
+                rule['RATE'],
+                algorithm=rule.get('ALGORITHM', 'token_bucket'),
+                burst=rule.get('BURST'),
+                backend=backend,
+            )
+            for scope, rule in conf.get('SCOPES', {}).items()
+        }
+    return _limiters
+
+
+def reset_rate_limits():
+    """
+    Rebuild the limiters on next use, dropping in-process state (tests).
+    """
+    global _limiters
+    _limiters = None
+
+
+@receiver(setting_changed)
+def _reset_limiters(setting, **kwargs):
+    if setting == 'RATE_LIMITS':
+        reset_rate_limits()
+
+
+def rate_limit_wait(scope, **keys):
+    """
+    Hit the ``<scope>_<kind>`` limiter for each ``kind=key`` given; return
+    the longest wait (0.0 if every configured limiter allows the request).
+    """
+    limiters = get_rate_limiters()
+    wait = 0.0
+    for kind, key in keys.items():
+        limiter = limiters.get(f'{scope}_{kind}')
+        if limiter is not None and key:
+            wait = max(wait, limiter.hit(key))
+    return wait
+
+
+def normalize_email_key(email):
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Applies the ``<scope>_<kind>`` limiter, keyed by ``get_key()``.
+    Subclass with a ``scope``; unconfigured limiters do not limit.
+    """
+
+    scope = None
+    kind = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self._wait = rate_limit_wait(
+            self.scope, **{self.kind: self.get_key(request, view)}
+        )
+        return not self._wait
+
+    def wait(self):
+        return self._wait
+
+
+class IPRateThrottle(RateLimitThrottle):
+    kind = 'ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailRateThrottle(RateLimitThrottle):
+    """
+    Per-email debouncing, keyed by the (case-folded) ``email`` in the body.
+    """
+
+    kind = 'email'
+
+    def get_key(self, request, view):
+        data = request.data
+        return normalize_email_key(data.get('email')) if hasattr(
+            data, 'get'
+        ) else None
+
+
+class UserRateThrottle(RateLimitThrottle):
+    kind = 'user'
+
+    def get_key(self, request, view):
+        user = request.user
+        return str(user.pk) if user and user.is_authenticated else None
+
+
+def throttled(scope):
+    """
+    Apply the ``<scope>_ip`` and ``<scope>_email`` limiters to an async
+    (plain Django) view, answering 429 with ``Retry-After``.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            # Parsed once, with the fast parser; the view reuses it
+            data = parse_request(request)
+            email = data.get('email') if data is not None else None
+            keys = {
+                'ip': BaseThrottle().get_ident(request),
+                'email': normalize_email_key(email),
+            }
+            if getattr(settings, 'RATE_LIMITS', {}).get('BACKEND') == 'cache':
+                wait = await sync_to_async(rate_limit_wait)(scope, **keys)
+            else:
+                wait = rate_limit_wait(scope, **keys)
+
+            if wait:
+                response = JsonResponse({
+                    'detail': 'Request was throttled. Expected available '
+                              f'in {math.ceil(wait)} seconds.'
+                }, status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+# apps/core/utils/fastjson.py
+
+import json
+
+import ujson
+from django.http import HttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF's conversions (UUID, datetime, Decimal, lazy strings, ...) for the
+# types ujson does not serialize itself
+_encoder = JSONEncoder()
+
+# Only the stdlib parser can reject these while parsing
+_NON_FINITE = (b'NaN', b'Infinity')
+
+
+def dumps(data, indent=None, ensure_ascii=False, allow_nan=False) -> str:
+    """
+    ``json.dumps(data, cls=JSONEncoder)``, compact, through ujson.
+    """
+    return ujson.dumps(
+        data,
+        ensure_ascii=ensure_ascii,
+        escape_forward_slashes=False,
+        allow_nan=allow_nan,
+        indent=indent or 0,
+        default=_encoder.default,
+    )
+
+
+def loads(raw, strict=True):
+    """
+    Parse JSON ``bytes`` or ``str``. With ``strict``, NaN and Infinity are
+    rejected, as the stdlib parser does with ``parse_constant``.
+    """
+    if strict:
+        encoded = raw.encode() if isinstance(raw, str) else raw
+        if any(constant in encoded for constant in _NON_FINITE):
+            return json.loads(raw, parse_constant=_reject_constant)
+    return ujson.loads(raw)
+
+
+def _reject_constant(constant):
+    raise ValueError(f'Invalid JSON constant {constant!r}')
+
+
+def parse_request(request):
+    """
+    Return the JSON object in a plain Django request's body, or None if it
+    is not one. Parsed once per request: the ``throttled`` decorator and
+    the view it wraps share the result.
+    """
+    try:
+        return request._json_object
+    except AttributeError:
+        pass
+    try:
+        data = loads(request.body or b'{}')
+    except ValueError:
+        data = None
+    request._json_object = data if isinstance(data, dict) else None
+    return request._json_object
+
+
+class JSONResponse(HttpResponse):
+    """
+    ``JsonResponse`` encoded with ``dumps``.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
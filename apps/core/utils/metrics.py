@@ -0,0 +1,362 @@
+# apps/core/utils/metrics.py
+
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Upper bounds (seconds); one extra bucket counts everything slower
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+HASH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def get_metrics_settings():
+    conf = {
+        'ENABLED': True,
+        'TOKEN': None,
+        'MULTIPROCESS_DIR': None,
+        'FLUSH_INTERVAL': 5,
+    }
+    conf.update(getattr(settings, 'METRICS', {}))
+    return conf
+
+
+class RequestRecord:
+    """
+    What one request spent, filled in while it runs.
+    """
+
+    __slots__ = ('started', 'queries', 'query_seconds', 'hash_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.hash_seconds = 0.0
+
+
+class RouteStats:
+    __slots__ = (
+        'buckets', 'count', 'seconds', 'statuses', 'queries',
+        'query_seconds', 'hash_seconds',
+    )
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.statuses = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.hash_seconds = 0.0
+
+
+class Shard:
+    """
+    One thread's counters. Only the owning thread writes to a shard, so
+    recording takes no lock; readers sum every shard.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.hash_buckets = [0] * (len(HASH_BUCKETS) + 1)
+        self.hash_count = 0
+        self.hash_seconds = 0.0
+
+    def clear(self):
+        self.__init__()
+
+
+_shards = []
+_shards_lock = threading.Lock()
+_local = threading.local()
+_current = ContextVar('metrics_request', default=None)
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = Shard()
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def begin_request():
+    record = RequestRecord()
+    return record, _current.set(record)
+
+
+def end_request(record, token, method, route, status):
+    """
+    Fold a finished request into this thread's shard.
+    """
+    _current.reset(token)
+    elapsed = time.perf_counter() - record.started
+
+    routes = _shard().routes
+    stats = routes.get((method, route))
+    if stats is None:
+        stats = routes[(method, route)] = RouteStats()
+    stats.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    stats.count += 1
+    stats.seconds += elapsed
+    stats.statuses[status] = stats.statuses.get(status, 0) + 1
+    stats.queries += record.queries
+    stats.query_seconds += record.query_seconds
+    stats.hash_seconds += record.hash_seconds
+
+    _maybe_flush()
+
+
+def observe_password_hash(seconds):
+    """
+    Record time spent in a password hasher (any thread, including the
+    hashing pool); attributed to the current request when there is one.
+    """
+    shard = _shard()
+    shard.hash_buckets[bisect_left(HASH_BUCKETS, seconds)] += 1
+    shard.hash_count += 1
+    shard.hash_seconds += seconds
+    record = _current.get()
+    if record is not None:
+        record.hash_seconds += seconds
+
+
+def _count_query(execute, sql, params, many, context):
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.queries += 1
+        record.query_seconds += time.perf_counter() - start
+
+
+def instrument_connection(connection):
+    """
+    Count ``connection``'s queries towards the current request.
+    """
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+@receiver(connection_created)
+def _instrument_new_connection(sender, connection, **kwargs):
+    instrument_connection(connection)
+
+
+def collect():
+    """
+    Sum every shard of this process into a JSON-able snapshot.
+    """
+    routes = {}
+    hashing = {
+        'buckets': [0] * (len(HASH_BUCKETS) + 1), 'count': 0, 'seconds': 0.0
+    }
+    with _shards_lock:
+        shards = list(_shards)
+
+    for shard in shards:
+        # list()/dict() copies are atomic under the GIL, so a shard being
+        # written to is never iterated directly
+        for (method, route), stats in list(shard.routes.items()):
+            merge_route(routes.setdefault(f'{method} {route}', {}), {
+                'buckets': list(stats.buckets),
+                'count': stats.count,
+                'seconds': stats.seconds,
+                'statuses': {
+                    str(code): n for code, n in dict(stats.statuses).items()
+                },
+                'queries': stats.queries,
+                'query_seconds': stats.query_seconds,
+                'hash_seconds': stats.hash_seconds,
+            })
+        merge_route(hashing, {
+            'buckets': list(shard.hash_buckets),
+            'count': shard.hash_count,
+            'seconds': shard.hash_seconds,
+        })
+    return {'routes': routes, 'password_hash': hashing}
+
+
+def merge_route(into, stats):
+    for key, value in stats.items():
+        if key == 'buckets':
+            into[key] = [
+                a + b for a, b in zip(into.get(key) or [0] * len(value), value)
+            ]
+        elif key == 'statuses':
+            statuses = into.setdefault(key, {})
+            for code, n in value.items():
+                statuses[code] = statuses.get(code, 0) + n
+        else:
+            into[key] = into.get(key, 0) + value
+    return into
+
+
+def merge(snapshots):
+    total = {'routes': {}, 'password_hash': {}}
+    for snapshot in snapshots:
+        for name, stats in snapshot['routes'].items():
+            merge_route(total['routes'].setdefault(name, {}), stats)
+        merge_route(total['password_hash'], snapshot['password_hash'])
+    return total
+
+
+# Multi-process aggregation: every worker writes its snapshot to
+# MULTIPROCESS_DIR/<pid>.json; /metrics sums all of them.
+
+_next_flush = 0.0
+
+
+def _maybe_flush():
+    global _next_flush
+    now = time.monotonic()
+    if now < _next_flush:
+        return
+    conf = get_metrics_settings()
+    _next_flush = now + conf['FLUSH_INTERVAL']
+    if conf['MULTIPROCESS_DIR']:
+        flush(conf['MULTIPROCESS_DIR'])
+
+
+def flush(directory):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump(collect(), fh)
+    os.replace(tmp, path)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        directory = get_metrics_settings()['MULTIPROCESS_DIR']
+    except Exception:
+        return
+    if directory:
+        flush(directory)
+
+
+def snapshot():
+    """
+    This process's counters, or every worker's when MULTIPROCESS_DIR is set.
+    """
+    directory = get_metrics_settings()['MULTIPROCESS_DIR']
+    if not directory:
+        return collect()
+
+    flush(directory)
+    snapshots = []
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as fh:
+                snapshots.append(json.load(fh))
+        except (OSError, ValueError):
+            continue  # being replaced or removed
+    return merge(snapshots)
+
+
+def reset_metrics():
+    """
+    Zero every counter in this process (tests).
+    """
+    with _shards_lock:
+        for shard in _shards:
+            shard.clear()
+
+
+@receiver(setting_changed)
+def _reset_flush(setting, **kwargs):
+    global _next_flush
+    if setting == 'METRICS':
+        _next_flush = 0.0
+
+
+def _labels(**labels):
+    return ','.join(
+        f'{key}="{value}"' for key, value in labels.items()
+    )
+
+
+def _histogram(lines, name, bounds, buckets, count, seconds, **labels):
+    cumulative = 0
+    for bound, n in zip(list(bounds) + ['+Inf'], buckets):
+        cumulative += n
+        lines.append(
+            f'{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}'
+        )
+    suffix = f'{{{_labels(**labels)}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {seconds}')
+    lines.append(f'{name}_count{suffix} {count}')
+
+
+def render(data) -> str:
+    """
+    Prometheus text exposition format (0.0.4) for a snapshot.
+    """
+    routes = sorted(
+        (name.split(' ', 1), stats) for name, stats in data['routes'].items()
+    )
+    lines = [
+        '# HELP http_request_duration_seconds Request latency by route.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (method, route), stats in routes:
+        _histogram(
+            lines, 'http_request_duration_seconds', LATENCY_BUCKETS,
+            stats['buckets'], stats['count'], stats['seconds'],
+            method=method, route=route,
+        )
+
+    lines += [
+        '# HELP http_requests_total Responses by route and status code.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (method, route), stats in routes:
+        for status, n in sorted(stats['statuses'].items()):
+            labels = _labels(method=method, route=route, status=status)
+            lines.append(f'http_requests_total{{{labels}}} {n}')
+
+    for name, key, help_text in (
+        ('http_db_queries_total', 'queries', 'Database queries'),
+        ('http_db_query_seconds_total', 'query_seconds',
+         'Time spent in database queries'),
+        ('http_password_hash_seconds_total', 'hash_seconds',
+         'Time spent hashing passwords on the request thread'),
+    ):
+        lines += [
+            f'# HELP {name} {help_text}, by route.',
+            f'# TYPE {name} counter',
+        ]
+        for (method, route), stats in routes:
+            labels = _labels(method=method, route=route)
+            lines.append(f'{name}{{{labels}}} {stats[key]}')
+
+    hashing = data['password_hash']
+    lines += [
+        '# HELP password_hash_seconds Password hasher run time.',
+        '# TYPE password_hash_seconds histogram',
+    ]
+    _histogram(
+        lines, 'password_hash_seconds', HASH_BUCKETS,
+        hashing.get('buckets') or [0] * (len(HASH_BUCKETS) + 1),
+        hashing.get('count', 0), hashing.get('seconds', 0.0),
+    )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,29 @@
+# apps/core/utils/pagination.py
+
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from apps.core.utils.database import estimate_row_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for tables too large to ``COUNT(*)`` on every page (e.g. as
+    ``ModelAdmin.paginator``).
+
+    An unfiltered queryset is counted from the planner's row estimate once
+    that reaches ``exact_below``. A filtered one is counted exactly, but
+    only up to ``max_count`` rows; pages past that are not linked.
+    """
+
+    exact_below = 10_000
+    max_count = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+        return queryset[:self.max_count].count()
@@ -1,9 +1,18 @@
 # views.py
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from apps.auth.authentication import CachedJWTAuthentication
+from apps.core.utils.admission import get_limiters
+from apps.core.utils.metrics import get_metrics_settings, render, snapshot
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -33,8 +42,50 @@ def api_endpoints(request) -> Response:
             'request':  {'token': '<jwt>'},
             'response': {},
         },
-        'auth/register/confirm': {
-            'url':      reverse('registration_confirm', request=request),
+        'auth/token/verify/batch': {
+            'url':      reverse('token_verify_batch', request=request),
+            'method':   'POST',
+            'request':  {'tokens': ['<jwt>', '<jwt>']},
+            'response': {
+                'results': [
+                    {'valid': True, 'claims': {'user_id': '<uuid>'}},
+                    {'valid': False, 'error': 'Token is blacklisted'},
+                ],
+            },
+        },
+        'auth/logout/all': {
+            'url':      reverse('logout_all', request=request),
+            'method':   'POST',
+            'response': None,  # 204; every token issued so far is revoked
+        },
+        # DELETE auth/sessions/<id> revokes one of them (204)
+        'auth/sessions': {
+            'url':      reverse('session_list', request=request),
+            'method':   'GET',
+            'response': {
+                'next': '<url>?cursor=...',
+                'previous': None,
+                'results': [{
+                    'id': '<uuid>',
+                    'device': 'Mozilla/5.0 ...',
+                    'ip_address': '203.0.113.7',
+                    'created_at': '2025-07-24T12:00:00Z',
+                    'last_used_at': '2025-07-25T08:30:00Z',
+                    'expires_at': '2025-08-24T08:30:00Z',
+                    'current': True,
+                }],
+            },
+        },
+        '.well-known/jwks.json': {
+            'url':      reverse('jwks', request=request),
+            'method':   'GET',
+            'response': {
+                'keys': [{'kty': 'RSA', 'kid': '<kid>', 'alg': 'RS256',
+                          'use': 'sig', 'n': '...', 'e': 'AQAB'}],
+            },
+        },
+        'auth/register/start': {
+            'url':      reverse('registration_start', request=request),
             'method':   'POST',
             'request':  {
                 'email': 'user@example.com',
@@ -42,10 +93,41 @@ def api_endpoints(request) -> Response:
                 'confirm_password': ''  # optional if third‑party auth
             },
             'response': {
-                'id': 60,
+                'detail': 'Check your email for the verification code.',
+                'payload': '<signed payload>',
+            },
+        },
+        'auth/register/confirm': {
+            'url':      reverse('registration_confirm', request=request),
+            'method':   'POST',
+            'request':  {
+                'email': 'user@example.com',
+                'otp': '493207',
+                'payload': '<signed payload from start>',
+            },
+            'response': {
+                'id': '<uuid>',
                 'email': 'user@example.com',
             },
         },
+        'admission': {
+            'url':      reverse('admission_status', request=request),
+            'method':   'GET',
+            'response': {
+                'token_obtain': {
+                    'in_flight': 3, 'queued': 0, 'admitted': 1200,
+                    'rejected': 4, 'max_concurrent': 4, 'max_queue': 16,
+                },
+            },
+        },
+        'metrics': {
+            'url':      reverse('metrics', request=request),
+            'method':   'GET',
+            'response': (
+                'http_request_duration_seconds_bucket{method="GET",'
+                'route="account/me",le="0.005"} 42\n...'
+            ),
+        },
         'account/me': {
             'url':      reverse('user-detail', request=request),
             'method':   'GET',
@@ -60,5 +142,55 @@ def api_endpoints(request) -> Response:
                 }
             },
         },
+        'account/export': {
+            'url':      reverse('user-export', request=request),
+            'method':   'GET',
+            'query':    {'since': '<cursor>', 'limit': 1000},
+            'response': (
+                '{"id": "<uuid>", "email": "user@example.com", ..., '
+                '"profile": {...}, "cursor": "<cursor>"}\n...'
+            ),
+        },
     }
     return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admission_status(request) -> Response:
+    """
+    Current in-flight count, queue depth and totals per admission limiter
+    (this worker process only), for tuning ADMISSION_CONTROL.
+    """
+    return Response({
+        scope: limiter.stats() for scope, limiter in get_limiters().items()
+    })
+
+
+def metrics(request) -> HttpResponse:
+    """
+    Request metrics in the Prometheus text format: this process's, or every
+    worker's with METRICS['MULTIPROCESS_DIR']. Kept out of DRF so a scrape
+    costs no content negotiation.
+
+    Scrapers send ``Bearer <METRICS['TOKEN']>``. Without a token only
+    staff JWTs are accepted, unless DEBUG is on.
+    """
+    token = get_metrics_settings()['TOKEN']
+    if token:
+        given = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(given.encode(), f'Bearer {token}'.encode()):
+            return HttpResponse('Unauthorized\n', status=401)
+    elif not settings.DEBUG and not _is_staff(request):
+        return HttpResponse('Unauthorized\n', status=401)
+    return HttpResponse(
+        render(snapshot()), content_type='text/plain; version=0.0.4'
+    )
+
+
+def _is_staff(request) -> bool:
+    try:
+        authenticated = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
@@ -11,6 +11,14 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.api')
+# Persistent connections are not reused under ASGI and would pile up
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
+
+# Imported once apps are loaded. Build the revocation index before the
+# first request needs it.
+from apps.auth.services.revocation import warm_revocation_index  # noqa: E402
+
+warm_revocation_index()
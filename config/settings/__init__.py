@@ -0,0 +1,5 @@
+# Settings profiles: pick one with DJANGO_SETTINGS_MODULE.
+#   config.settings.dev   local development (manage.py default)
+#   config.settings.prod  production, with the admin
+#   config.settings.api   production API-only workers (wsgi/asgi default)
+#   config.settings.test  tests (manage.py test default)
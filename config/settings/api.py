@@ -0,0 +1,28 @@
+# Production API-only workers. Every API request authenticates with a
+# bearer JWT, so the admin, sessions, messages, CSRF, clickjacking headers
+# and templates are dropped from the request path (and from startup).
+from .prod import *  # noqa: F401,F403
+from .prod import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+BROWSER_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+BROWSER_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in BROWSER_APPS]
+MIDDLEWARE = [m for m in MIDDLEWARE if m not in BROWSER_MIDDLEWARE]
+TEMPLATES = []
+# The browsable API needs templates
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ('apps.core.renderers.JSONRenderer',),
+}
@@ -0,0 +1,379 @@
+"""
+Django settings shared by every profile (config.settings.dev, .prod, .api).
+
+Generated by 'django-admin startproject' using Django 5.2.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+import os
+from pathlib import Path
+from datetime import timedelta
+
+from apps.core.utils.database import parse_database_url
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+# (config.settings.prod refuses to start with this default)
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY',
+    'django-insecure-_+h_^tq)ism)kuloid)2fxn32e#g(+aqa==b&swe+deak$cbg='
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'corsheaders',
+    'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
+
+    # Apps
+    'apps.core.apps.CoreConfig',
+    'apps.account.apps.AccountConfig',
+    'apps.auth.apps.CustomAuthConfig',
+]
+
+# Simple Jwt
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'apps.auth.authentication.CachedJWTAuthentication',
+    ),
+    # DRF's JSON renderer and parser on ujson (apps.core.renderers/parsers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.core.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Authenticated user cache (apps.account.services.user_cache)
+# SHARED_CACHE is an optional CACHES alias used as a second tier.
+USER_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 30,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 300,
+}
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    # Token obtain writes last_login behind, in batches (LAST_LOGIN)
+    "UPDATE_LAST_LOGIN": False,
+
+    "ALGORITHM": "HS256",
+    "SIGNING_KEY": SECRET_KEY,
+    "VERIFYING_KEY": "",
+    "AUDIENCE": None,
+    "ISSUER": None,
+    "JSON_ENCODER": None,
+    "JWK_URL": None,
+    "LEEWAY": 0,
+
+    "AUTH_HEADER_TYPES": ("Bearer",),
+    "AUTH_HEADER_NAME": "HTTP_AUTHORIZATION",
+    "USER_ID_FIELD": "id",
+    "USER_ID_CLAIM": "user_id",
+    "USER_AUTHENTICATION_RULE": "rest_framework_simplejwt.authentication.default_user_authentication_rule",
+
+    "AUTH_TOKEN_CLASSES": ("apps.auth.tokens.AccessToken",),
+    "TOKEN_TYPE_CLAIM": "token_type",
+    "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
+
+    "JTI_CLAIM": "jti",
+
+    "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
+    "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
+    "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=30),
+
+    "TOKEN_OBTAIN_SERIALIZER": "apps.auth.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.auth.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "apps.auth.serializers.TokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
+    "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
+    "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
+}
+
+# Asymmetric JWT signing (apps.auth.services.keys)
+# KEYS_DIR holds one <kid>.pem per key (private, or public-only once
+# retired); tokens carry a `kid` header and /.well-known/jwks.json publishes
+# every public key. Without KEYS_DIR tokens fall back to SIMPLE_JWT's HS256.
+JWT_SIGNING_KEYS = {
+    'KEYS_DIR': os.environ.get('JWT_KEYS_DIR'),
+    'ACTIVE_KID': os.environ.get('JWT_ACTIVE_KID'),
+}
+
+# Streaming user export (/account/export, exportusers). Rows updated in the
+# last SETTLE_SECONDS are held back until their transactions have settled.
+USER_EXPORT = {
+    'PAGE_SIZE': 1000,
+    'SETTLE_SECONDS': 5,
+}
+
+# Rate limits (apps.core.utils.debounce), by '<scope>_<ip|email|user>'.
+# BACKEND 'local' keeps counters per process; 'cache' shares them through
+# the CACHES alias in CACHE (atomic incr).
+RATE_LIMITS = {
+    'BACKEND': 'local',
+    'CACHE': 'default',
+    'SCOPES': {
+        'token_obtain_ip': {'RATE': '30/min', 'BURST': 10},
+        'token_obtain_email': {'RATE': '10/min', 'BURST': 5},
+        'token_refresh_ip': {'RATE': '120/min', 'BURST': 30},
+        'registration_ip': {
+            'RATE': '20/hour', 'ALGORITHM': 'sliding_window',
+        },
+        'registration_email': {
+            'RATE': '5/hour', 'ALGORITHM': 'sliding_window',
+        },
+        # Verification code attempts
+        'registration_confirm_ip': {'RATE': '30/hour', 'BURST': 10},
+        'registration_confirm_email': {
+            'RATE': '5/10min', 'ALGORITHM': 'sliding_window',
+        },
+    },
+}
+
+# Two-step registration (apps.auth.services.registration). OTP_SENDER is a
+# class with send(email, otp): ConsoleOTPSender, FileOTPSender(path) or
+# EmailOTPSender(subject, from_email), configured via OTP_SENDER_OPTIONS.
+REGISTRATION = {
+    'OTP_TTL': 600,
+    'OTP_DIGITS': 6,
+    'OTP_SENDER': 'apps.auth.services.registration.ConsoleOTPSender',
+    'OTP_SENDER_OPTIONS': {},
+}
+
+# Max tokens per POST /auth/token/verify/batch
+TOKEN_VERIFY_BATCH_MAX = 100
+
+# Serve token obtain / registration from async views (use with ASGI)
+AUTH_ASYNC_VIEWS = os.environ.get('AUTH_ASYNC_VIEWS', '') == '1'
+
+# Pool that runs password hashing for the async views
+# (apps.auth.services.hashing); EXECUTOR is 'thread' or 'process'.
+PASSWORD_HASHING = {
+    'EXECUTOR': 'thread',
+    'MAX_WORKERS': 2,
+}
+
+# Concurrency limits for the password-hashing endpoints
+# (apps.core.utils.admission). Requests beyond MAX_CONCURRENT wait up to
+# QUEUE_TIMEOUT seconds in a queue of MAX_QUEUE; the rest get 503 with
+# Retry-After.
+ADMISSION_CONTROL = {
+    'token_obtain': {
+        'MAX_CONCURRENT': 4,
+        'MAX_QUEUE': 16,
+        'QUEUE_TIMEOUT': 2.0,
+        'RETRY_AFTER': 1,
+    },
+    'registration': {
+        'MAX_CONCURRENT': 2,
+        'MAX_QUEUE': 8,
+        'QUEUE_TIMEOUT': 2.0,
+        'RETRY_AFTER': 2,
+    },
+}
+
+# Blacklisted-JTI index (apps.auth.services.revocation)
+REVOCATION_INDEX = {
+    'CAPACITY': 1_000_000,
+    'ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': 1.0,
+    'SYNC_OVERLAP': 100,
+    'REBUILD_INTERVAL': 3600,
+}
+
+# Write-behind last_login (apps.auth.services.last_login). Logins are
+# written as one UPDATE, when a request finishes, every FLUSH_INTERVAL
+# seconds (or once MAX_PENDING users wait) and at exit; none is recorded
+# while the stored value is under PRECISION seconds old.
+LAST_LOGIN = {
+    'PRECISION': 300,
+    'FLUSH_INTERVAL': 10,
+    'MAX_PENDING': 1000,
+}
+
+# Request metrics (apps.core.utils.metrics), served at /metrics in the
+# Prometheus text format. With TOKEN set, scrapes must send
+# "Authorization: Bearer <TOKEN>". With MULTIPROCESS_DIR set, each worker
+# process writes its counters there every FLUSH_INTERVAL seconds and
+# /metrics sums them; clear the directory when the service is redeployed.
+METRICS = {
+    'ENABLED': True,
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+    'MULTIPROCESS_DIR': os.environ.get('METRICS_MULTIPROCESS_DIR'),
+    'FLUSH_INTERVAL': 5,
+}
+
+# MiddleWare
+MIDDLEWARE = [
+    'apps.core.middleware.MetricsMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+
+    # CORS
+    "corsheaders.middleware.CorsMiddleware",
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# CORS settings
+CORS_ALLOWED_ALL_ORIGINS = True
+
+ROOT_URLCONF = 'config.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'config.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+
+# DATABASE_URL is the primary; DATABASE_REPLICA_URLS (comma-separated)
+# become the aliases replica_1, replica_2, ... Connections are kept for
+# DATABASE_CONN_MAX_AGE seconds and checked before reuse (asgi.py defaults
+# it to 0: persistent connections are not reused under ASGI).
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 60))
+
+DATABASES = {
+    'default': parse_database_url(
+        os.environ.get('DATABASE_URL', f'sqlite:///{BASE_DIR / "db.sqlite3"}'),
+        conn_max_age=DATABASE_CONN_MAX_AGE,
+        health_checks=True,
+    ),
+}
+for i, url in enumerate(
+    filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1
+):
+    DATABASES[f'replica_{i}'] = {
+        **parse_database_url(
+            url.strip(), conn_max_age=DATABASE_CONN_MAX_AGE, health_checks=True
+        ),
+        # Tests read the test primary through every replica alias
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['apps.core.utils.database.ReplicaRouter']
+
+# Views (URL names) whose reads may go to a replica, until they write
+DATABASE_REPLICA_ROUTES = [
+    'user-detail',
+    'user-export',
+    'token_verify',
+    'token_verify_batch',
+]
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+# Custom Auth and User
+AUTH_USER_MODEL = "account.CustomUser"
+
+# CustomUser.email is unique through a lower(email) UniqueConstraint, which
+# the USERNAME_FIELD check does not recognise
+SILENCED_SYSTEM_CHECKS = ['auth.E003']
+
+# Django's defaults, with PBKDF2 timed for the password_hash_seconds metric
+PASSWORD_HASHERS = [
+    'apps.auth.hashers.TimedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Sorted SHA-1 file built by `manage.py buildbreachedcorpus`
+BREACHED_PASSWORDS_FILE = os.environ.get('BREACHED_PASSWORDS_FILE')
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    # The breached-password corpus (apps.auth.password_validation), when
+    # there is one, supersedes Django's in-memory list of 20k passwords
+    {
+        'NAME': 'apps.auth.password_validation.BreachedPasswordValidator',
+        'OPTIONS': {'path': BREACHED_PASSWORDS_FILE},
+    } if BREACHED_PASSWORDS_FILE else {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
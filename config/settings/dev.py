@@ -0,0 +1,4 @@
+# Development: debug on, local SQLite, console OTPs
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
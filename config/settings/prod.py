@@ -0,0 +1,41 @@
+# Production, with the admin (run it on its own workers; API traffic goes
+# to config.settings.api)
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import METRICS, REGISTRATION, SECRET_KEY
+
+if SECRET_KEY.startswith('django-insecure-'):
+    raise ImproperlyConfigured('Set DJANGO_SECRET_KEY for production.')
+
+# /metrics is public without a token
+if METRICS['ENABLED'] and not METRICS['TOKEN']:
+    raise ImproperlyConfigured('Set METRICS_TOKEN for production.')
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+
+# Registration codes go out by email, never to the logs
+REGISTRATION = {
+    **REGISTRATION,
+    'OTP_SENDER': 'apps.auth.services.registration.EmailOTPSender',
+}
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+DEFAULT_FROM_EMAIL = os.environ.get(
+    'DEFAULT_FROM_EMAIL', 'webmaster@localhost'
+)
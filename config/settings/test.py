@@ -0,0 +1,11 @@
+# Tests (manage.py test default): dev, plus a second test database
+from .dev import *  # noqa: F401,F403
+from .dev import DATABASE_REPLICAS, DATABASES
+
+from apps.core.utils.database import parse_database_url
+
+# Without configured replicas, replica_1 is a separate in-memory database,
+# not a mirror of the primary. It is left out of DATABASE_REPLICAS, so it
+# is migrated and routing is unchanged unless a test opts in.
+if not DATABASE_REPLICAS:
+    DATABASES = {**DATABASES, 'replica_1': parse_database_url('sqlite://')}
@@ -1,9 +1,12 @@
 # Main url Config
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 
+from apps.auth.views.jwks import jwks
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Public signing keys
+    path('.well-known/jwks.json', jwks, name='jwks'),
 
     # Apps url config
     path('', include('apps.core.urls')),
@@ -11,3 +14,9 @@ urlpatterns = [
     path('auth/', include('apps.auth.urls')),
     path('account/', include('apps.account.urls')),
 ]
+
+# Not installed in the API-only profile (config.settings.api)
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
@@ -11,6 +11,12 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.api')
 
 application = get_wsgi_application()
+
+# Imported once apps are loaded. Build the revocation index before the
+# first request needs it.
+from apps.auth.services.revocation import warm_revocation_index  # noqa: E402
+
+warm_revocation_index()